@@ -1,9 +1,192 @@
 """Build commands for Velocity-DB."""
 
+import contextlib
+import hashlib
+import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 from . import utils
 
+# Directories that never contain CMake inputs (async_rmtree's .trash-* leftovers
+# are skipped by prefix as well)
+_CMAKE_SKIP_DIRS = frozenset({".git", "build", "dist", "frontend", "node_modules"})
+
+
+def _read_cache_entries(cache: Path, names: tuple[str, ...]) -> dict[str, str]:
+    """Read selected NAME:TYPE=VALUE entries from CMakeCache.txt.
+
+    The file is streamed and reading stops once every name has been seen, so
+    the (large) remainder of the cache is not read or decoded.
+    """
+    found: dict[str, str] = {}
+    try:
+        with cache.open(encoding="utf-8", errors="replace") as f:
+            for line in f:
+                key, sep, value = line.partition("=")
+                name = key.partition(":")[0]
+                if sep and name in names and name not in found:
+                    found[name] = value.rstrip("\r\n")
+                    if len(found) == len(names):
+                        break
+    except OSError:
+        pass
+    return found
+
+
+def _needs_configure(project_root: Path, build_dir: Path, cmake_cmd: list[str]) -> bool:
+    """Check whether CMake must be (re)configured.
+
+    Configure is skipped only when the previous configure used the same command
+    line, generated its build files (build.ninja / VelocityDB.sln), the cached
+    CMAKE_BUILD_TYPE matches the requested one, and CMakeCache.txt is newer than
+    every CMakeLists.txt / *.cmake file.
+    """
+    cache = build_dir / "CMakeCache.txt"
+    generated = build_dir / ("build.ninja" if "Ninja" in cmake_cmd else "VelocityDB.sln")
+    stamp = utils.read_json_cache(build_dir / ".configure_cmd.json")
+    if not cache.exists() or not generated.exists():
+        return True
+    if not stamp or stamp.get("cmd") != cmake_cmd:
+        return True
+
+    # The stamp only records our own configure; a manual `cmake -B build`
+    # with another build type must not be mistaken for a valid tree
+    build_type_arg = next((a for a in cmake_cmd if a.startswith("-DCMAKE_BUILD_TYPE=")), None)
+    if build_type_arg:
+        cached = _read_cache_entries(cache, ("CMAKE_BUILD_TYPE",)).get("CMAKE_BUILD_TYPE")
+        if cached != build_type_arg.partition("=")[2]:
+            return True
+
+    cache_mtime = cache.stat().st_mtime_ns
+    for dirpath, dirs, files in os.walk(project_root):
+        dirs[:] = [
+            d for d in dirs if d not in _CMAKE_SKIP_DIRS and not d.startswith(utils.TRASH_PREFIX)
+        ]
+        for name in files:
+            is_input = name == "CMakeLists.txt" or name.endswith(".cmake")
+            if is_input and os.stat(os.path.join(dirpath, name)).st_mtime_ns > cache_mtime:
+                return True
+    return False
+
+
+def _invalidate_stale_generator(build_dir: Path, generator: str) -> None:
+    """Drop CMakeCache.txt and CMakeFiles if they were made by another generator.
+
+    CMake refuses to reconfigure a build tree with a different generator, e.g.
+    when Ninja was installed or removed since the last configure. CMakeFiles is
+    renamed away and deleted in the background.
+    """
+    cache = build_dir / "CMakeCache.txt"
+    cached = _read_cache_entries(cache, ("CMAKE_GENERATOR",)).get("CMAKE_GENERATOR")
+    if not cached or cached == generator:
+        return
+
+    print(f"  Generator changed ({cached} -> {generator}), discarding CMake cache")
+    cache.unlink()
+    if (build_dir / "CMakeFiles").exists():
+        utils.async_rmtree(build_dir / "CMakeFiles")
+
+
+def _lockfile_is_current(lockfile: Path, frontend_dir: Path) -> bool:
+    """True if lockfile exists and is not older than package.json."""
+    if not lockfile.exists():
+        return False
+    # A lockfile older than package.json must be allowed to update
+    package_json = frontend_dir / "package.json"
+    return not package_json.exists() or lockfile.stat().st_mtime >= package_json.stat().st_mtime
+
+
+def _compiler_launcher_args(env: dict) -> list[str]:
+    """CMake flags routing compiles through sccache/ccache when one is installed."""
+    search_path = env.get("PATH") or env.get("Path")
+    launcher = utils.which("sccache", search_path) or utils.which("ccache", search_path)
+    if not launcher:
+        return []
+
+    print(f"  Compiler cache: {launcher}")
+    return [
+        f"-DCMAKE_C_COMPILER_LAUNCHER={launcher}",
+        f"-DCMAKE_CXX_COMPILER_LAUNCHER={launcher}",
+        # /Zi writes one shared PDB, which compiler caches cannot handle; embed
+        # debug info in the objects (/Z7) instead. Needs CMP0141 (CMake 3.25+).
+        "-DCMAKE_POLICY_DEFAULT_CMP0141=NEW",
+        "-DCMAKE_MSVC_DEBUG_INFORMATION_FORMAT=$<$<CONFIG:Debug,RelWithDebInfo>:Embedded>",
+    ]
+
+
+def _install_hash(frontend_dir: Path) -> str:
+    """Hash package.json and the lockfiles that determine node_modules."""
+    digest = hashlib.blake2b(digest_size=16)
+    for name in ("package.json", "bun.lock", "bun.lockb", "package-lock.json"):
+        path = frontend_dir / name
+        if path.exists():
+            digest.update(name.encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _install_command(pkg_manager: str, pkg_path: Path, frontend_dir: Path) -> list[str]:
+    """Build the dependency install command, honoring an up-to-date lockfile."""
+    has_bun_lock = (frontend_dir / "bun.lock").exists() or (frontend_dir / "bun.lockb").exists()
+    if has_bun_lock and (frontend_dir / "package-lock.json").exists():
+        print("  WARNING: Both a Bun lockfile and package-lock.json exist.")
+        print("           Keep only the lockfile of the package manager in use.")
+
+    if pkg_manager == "npm":
+        if _lockfile_is_current(frontend_dir / "package-lock.json", frontend_dir):
+            return [str(pkg_path), "ci"]
+        return [str(pkg_path), "install"]
+
+    install_cmd = [str(pkg_path), "install"]
+    lockfile = frontend_dir / "bun.lock"
+    if not lockfile.exists():
+        if (frontend_dir / "bun.lockb").exists():
+            print("  HINT: Binary bun.lockb detected; the text lockfile installs faster.")
+            print("        Migrate with: bun install --save-text-lockfile (Bun 1.1.40+)")
+        return install_cmd
+
+    if _lockfile_is_current(lockfile, frontend_dir):
+        install_cmd.append("--frozen-lockfile")
+    return install_cmd
+
+
+def install_frontend_deps(pkg_manager: str, pkg_path: Path, frontend_dir: Path) -> bool:
+    """Install frontend dependencies if node_modules is missing or stale."""
+    node_modules = frontend_dir / "node_modules"
+    package_json = frontend_dir / "package.json"
+
+    install_hash_file = node_modules / ".install-hash"
+
+    needs_install = not node_modules.exists()
+    if not needs_install and package_json.exists():
+        pkg_mtime = package_json.stat().st_mtime
+        nm_mtime = node_modules.stat().st_mtime
+        if pkg_mtime > nm_mtime:
+            # mtime alone misfires after checkouts/stashes; confirm by content
+            try:
+                installed_hash = install_hash_file.read_text(encoding="utf-8").strip()
+            except OSError:
+                installed_hash = None
+            if installed_hash != _install_hash(frontend_dir):
+                print("  package.json modified, reinstalling...")
+                needs_install = True
+
+    if needs_install:
+        install_cmd = _install_command(pkg_manager, pkg_path, frontend_dir)
+        success, _ = utils.run_command(
+            install_cmd, " ".join([pkg_manager, *install_cmd[1:]]), cwd=frontend_dir
+        )
+        if not success:
+            print("\nERROR: Failed to install dependencies")
+            return False
+        with contextlib.suppress(OSError):
+            install_hash_file.write_text(_install_hash(frontend_dir), encoding="utf-8")
+    else:
+        print("  Dependencies up to date")
+    return True
+
 
 def build_frontend(clean: bool = False) -> bool:
     """Build the frontend."""
@@ -27,7 +210,7 @@ def build_frontend(clean: bool = False) -> bool:
         for cache in caches:
             if cache.exists():
                 try:
-                    shutil.rmtree(cache)
+                    utils.async_rmtree(cache)
                     print(f"  [OK] Cleared: {cache.relative_to(project_root)}")
                 except Exception as e:
                     print(f"  [FAIL] {e}")
@@ -47,26 +230,8 @@ def build_frontend(clean: bool = False) -> bool:
 
     # Check dependencies
     print("\n[2/3] Checking dependencies...")
-    node_modules = frontend_dir / "node_modules"
-    package_json = frontend_dir / "package.json"
-
-    needs_install = not node_modules.exists()
-    if not needs_install and package_json.exists():
-        pkg_mtime = package_json.stat().st_mtime
-        nm_mtime = node_modules.stat().st_mtime
-        if pkg_mtime > nm_mtime:
-            print("  package.json modified, reinstalling...")
-            needs_install = True
-
-    if needs_install:
-        success, _ = utils.run_command(
-            [str(pkg_path), "install"], f"{pkg_manager} install", cwd=frontend_dir
-        )
-        if not success:
-            print("\nERROR: Failed to install dependencies")
-            return False
-    else:
-        print("  Dependencies up to date")
+    if not install_frontend_deps(pkg_manager, pkg_path, frontend_dir):
+        return False
 
     # Build
     print("\n[3/3] Building...")
@@ -80,8 +245,7 @@ def build_frontend(clean: bool = False) -> bool:
 
     # Report success
     dist_dir = frontend_dir / "dist"
-    total_size = sum(f.stat().st_size for f in dist_dir.rglob("*") if f.is_file())
-    file_count = sum(1 for _ in dist_dir.rglob("*") if _.is_file())
+    file_count, total_size = utils.summarize_tree(dist_dir)
 
     print(f"\n{'=' * 60}")
     print("  BUILD SUCCESSFUL")
@@ -96,8 +260,109 @@ def build_frontend(clean: bool = False) -> bool:
     return True
 
 
-def build_backend(build_type: str = "Release", clean: bool = False) -> bool:
-    """Build the backend."""
+def copy_frontend_dist(project_root: Path, build_type: str) -> None:
+    """Copy frontend/dist next to the backend executable."""
+    print("\n[Post-Build] Copying frontend files...")
+    frontend_dist = project_root / "frontend" / "dist"
+    frontend_target = project_root / "build" / build_type / "frontend"
+
+    if frontend_dist.exists():
+        try:
+            if frontend_target.exists():
+                shutil.rmtree(frontend_target)
+            file_count, _ = utils.copytree_parallel(frontend_dist, frontend_target)
+            print(f"  [OK] Copied: frontend/dist -> build/{build_type}/frontend")
+            print(f"  Files: {file_count}")
+        except Exception as e:
+            print(f"  [FAIL] {e}")
+    else:
+        print("  [SKIP] Frontend dist not found")
+        print("  Run 'uv run scripts/pdg.py build frontend' first")
+
+
+def _configure(
+    project_root: Path,
+    build_dir: Path,
+    build_type: str,
+    env: dict,
+    has_ninja: bool,
+    jobs: int,
+    fast: bool,
+) -> bool:
+    """Run CMake configure unless the existing configuration is still valid."""
+    if has_ninja:
+        # Job pools keep memory-hungry MSVC links from running all at once
+        cmake_cmd = [
+            "cmake",
+            "-B",
+            "build",
+            "-G",
+            "Ninja",
+            f"-DCMAKE_BUILD_TYPE={build_type}",
+            f"-DCMAKE_JOB_POOLS=compile={jobs};link=2",
+            "-DCMAKE_JOB_POOL_COMPILE=compile",
+            "-DCMAKE_JOB_POOL_LINK=link",
+        ]
+        cmake_cmd += _compiler_launcher_args(env)
+    else:
+        cmake_cmd = ["cmake", "-B", "build", "-G", "Visual Studio 17 2022", "-A", "x64"]
+    cmake_cmd.append(f"-DCMAKE_SUPPRESS_REGENERATION={'ON' if fast else 'OFF'}")
+
+    if not _needs_configure(project_root, build_dir, cmake_cmd):
+        print("  CMakeCache.txt is up to date, skipping configure")
+        return True
+
+    generator = cmake_cmd[cmake_cmd.index("-G") + 1]
+    _invalidate_stale_generator(build_dir, generator)
+    success, stderr = utils.run_command(cmake_cmd, "CMake Configure", env=env, capture_output=True)
+    if not success:
+        print("\nERROR: CMake configuration failed")
+        return False
+    utils.write_json_cache(build_dir / ".configure_cmd.json", {"cmd": cmake_cmd})
+    return True
+
+
+def configure_backend() -> bool:
+    """Configure the backend without building it (e.g. for compile_commands.json).
+
+    Reuses the build type and --fast setting of the last configure so an
+    existing build tree is not flipped between configurations.
+    """
+    project_root = utils.get_project_root()
+    build_dir = project_root / "build"
+
+    last_cmd = (utils.read_json_cache(build_dir / ".configure_cmd.json") or {}).get("cmd", [])
+    build_type = "Debug" if "-DCMAKE_BUILD_TYPE=Debug" in last_cmd else "Release"
+    fast = "-DCMAKE_SUPPRESS_REGENERATION=ON" in last_cmd
+
+    env = utils.get_msvc_env()
+    tools_ok, has_ninja = utils.check_build_tools(env)
+    if not tools_ok:
+        return False
+    build_dir.mkdir(exist_ok=True)
+    jobs = os.process_cpu_count() or 1
+    return _configure(project_root, build_dir, build_type, env, has_ninja, jobs, fast)
+
+
+def build_backend(
+    build_type: str = "Release",
+    clean: bool = False,
+    refresh_env: bool = False,
+    post_build: bool = True,
+    fast: bool = False,
+    jobs: int | None = None,
+) -> bool:
+    """Build the backend.
+
+    fast=True configures with CMAKE_SUPPRESS_REGENERATION, so the build itself
+    no longer re-checks CMake inputs; build_backend still reconfigures when a
+    CMakeLists.txt changes (see _needs_configure).
+
+    With post_build=False the frontend copy and WebView2 cache clear are left
+    to the caller (build_all runs them once both builds have finished).
+
+    jobs caps build parallelism (default: utils.default_jobs()).
+    """
     if build_type not in ("Debug", "Release"):
         print(f"ERROR: Invalid build type '{build_type}'. Use 'Debug' or 'Release'")
         return False
@@ -114,40 +379,46 @@ def build_backend(build_type: str = "Release", clean: bool = False) -> bool:
     # Clean build directory if requested
     if clean and build_dir.exists():
         print("\n[Cleaning build directory...]")
-        shutil.rmtree(build_dir)
+        utils.async_rmtree(build_dir)
         print(f"  Removed: {build_dir}")
 
     # Setup MSVC environment
     print("\n[1/4] Setting up MSVC environment...")
-    env = utils.get_msvc_env()
+    env = utils.get_msvc_env(refresh=refresh_env)
 
     # Check tools
     print("\n[2/4] Checking build tools...")
-    if not utils.check_build_tools(env):
+    tools_ok, has_ninja = utils.check_build_tools(env)
+    if not tools_ok:
         return False
 
-    # Check for Ninja
-    has_ninja = shutil.which("ninja") is not None
-
     # Create build directory
     build_dir.mkdir(exist_ok=True)
 
+    # The Ninja compile pool always matches the CPU count so the configure
+    # command (and with it the configure skip) does not depend on --jobs;
+    # the build command below applies the actual cap
+    cpus = os.process_cpu_count() or 1
+    jobs = jobs or utils.default_jobs()
+
     # Configure
     print("\n[3/4] Configuring with CMake...")
-    if has_ninja:
-        cmake_cmd = ["cmake", "-B", "build", "-G", "Ninja", f"-DCMAKE_BUILD_TYPE={build_type}"]
-    else:
-        cmake_cmd = ["cmake", "-B", "build", "-G", "Visual Studio 17 2022", "-A", "x64"]
-
-    success, stderr = utils.run_command(cmake_cmd, "CMake Configure", env=env, capture_output=True)
-    if not success:
-        print("\nERROR: CMake configuration failed")
+    if not _configure(project_root, build_dir, build_type, env, has_ninja, cpus, fast):
         return False
 
     # Build
     print("\n[4/4] Building...")
-    build_cmd = ["cmake", "--build", "build", "--config", build_type, "--parallel"]
-    success, _ = utils.run_command(build_cmd, f"CMake Build ({build_type})", env=env)
+    if has_ninja and (build_dir / "build.ninja").exists():
+        # Call ninja directly instead of through the `cmake --build` driver;
+        # build.ninja still re-runs CMake itself if a CMakeLists.txt changed
+        build_cmd = ["ninja", "-C", "build", "-j", str(jobs)]
+        description = f"Ninja Build ({build_type})"
+    else:
+        build_cmd = ["cmake", "--build", "build", "--config", build_type, "--parallel", str(jobs)]
+        description = f"CMake Build ({build_type})"
+    # Also picked up by nested `cmake --build` calls (e.g. MSBuild sub-projects)
+    build_env = {**env, "CMAKE_BUILD_PARALLEL_LEVEL": str(jobs)}
+    success, _ = utils.run_command(build_cmd, description, env=build_env)
     if not success:
         print("\nERROR: Build failed")
         return False
@@ -155,9 +426,7 @@ def build_backend(build_type: str = "Release", clean: bool = False) -> bool:
     # Find executable
     exe_path = build_dir / build_type / "VelocityDB.exe"
     if not exe_path.exists():
-        for exe in build_dir.rglob("VelocityDB.exe"):
-            exe_path = exe
-            break
+        exe_path = utils.find_first(build_dir, "VelocityDB.exe") or exe_path
 
     print(f"\n{'=' * 60}")
     print("  BUILD SUCCESSFUL")
@@ -166,27 +435,9 @@ def build_backend(build_type: str = "Release", clean: bool = False) -> bool:
         print(f"\n  Executable: {exe_path}")
         print(f"  Size: {exe_path.stat().st_size / 1024 / 1024:.2f} MB")
 
-    # Copy frontend files
-    print("\n[Post-Build] Copying frontend files...")
-    frontend_dist = project_root / "frontend" / "dist"
-    frontend_target = build_dir / build_type / "frontend"
-
-    if frontend_dist.exists():
-        try:
-            if frontend_target.exists():
-                shutil.rmtree(frontend_target)
-            shutil.copytree(frontend_dist, frontend_target)
-            file_count = sum(1 for _ in frontend_target.rglob("*") if _.is_file())
-            print(f"  [OK] Copied: frontend/dist -> build/{build_type}/frontend")
-            print(f"  Files: {file_count}")
-        except Exception as e:
-            print(f"  [FAIL] {e}")
-    else:
-        print("  [SKIP] Frontend dist not found")
-        print("  Run 'uv run scripts/pdg.py build frontend' first")
-
-    # Clear WebView2 cache
-    utils.clear_webview2_cache(project_root)
+    if post_build:
+        copy_frontend_dist(project_root, build_type)
+        utils.clear_webview2_cache(project_root)
 
     # Final output: Show binary location
     if exe_path.exists():
@@ -199,23 +450,43 @@ def build_backend(build_type: str = "Release", clean: bool = False) -> bool:
     return True
 
 
-def build_all(build_type: str = "Release", clean: bool = False) -> bool:
+def build_all(
+    build_type: str = "Release",
+    clean: bool = False,
+    refresh_env: bool = False,
+    fast: bool = False,
+    jobs: int | None = None,
+) -> bool:
     """Build both frontend and backend."""
     project_root = utils.get_project_root()
     build_dir = project_root / "build"
 
     print(f"\n{'=' * 60}")
-    print("  Building All (Frontend + Backend)")
+    print("  Building All (Frontend + Backend in parallel)")
     print(f"{'=' * 60}")
 
-    # Build frontend first
-    if not build_frontend(clean=clean):
-        return False
+    # The builds share nothing until the frontend copy, so build the frontend
+    # on a worker thread (its output is shown as one block when it finishes)
+    # while the backend builds in the foreground.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        frontend_future = utils.submit_buffered(executor, build_frontend, clean=clean)
+        backend_ok = build_backend(
+            build_type=build_type,
+            clean=clean,
+            refresh_env=refresh_env,
+            post_build=False,
+            fast=fast,
+            jobs=jobs,
+        )
+        frontend_ok, frontend_output = frontend_future.result()
+    print(frontend_output, end="")
 
-    # Then build backend
-    if not build_backend(build_type=build_type, clean=clean):
+    if not (frontend_ok and backend_ok):
         return False
 
+    copy_frontend_dist(project_root, build_type)
+    utils.clear_webview2_cache(project_root)
+
     print(f"\n{'=' * 60}")
     print("  ALL BUILDS SUCCESSFUL")
     print(f"{'=' * 60}")
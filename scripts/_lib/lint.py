@@ -1,9 +1,130 @@
 """Lint commands for Velocity-DB."""
 
-import shutil
+import hashlib
+import json
+import os
+import re
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
-from . import utils
+from . import build, utils
+
+# Maximum number of files passed to a single clang-format invocation
+CLANG_FORMAT_BATCH_SIZE = 32
+
+# Character budget for one batch's paths (Windows command lines max out at 32767)
+CLANG_FORMAT_ARGV_BUDGET = 30000
+
+# clang-tidy diagnostic header, e.g. "C:\src\a.cpp:12:5: warning: ... [check-name]".
+# Quoted source lines and notes that merely contain "warning:" do not match.
+_TIDY_WARNING_RE = re.compile(r"^.+:\d+:\d+: warning: ", re.MULTILINE)
+
+
+def _stat_key(path: Path) -> list[int] | None:
+    """Return [mtime_ns, size] used to detect unchanged files, or None if missing."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _file_digest(path: Path) -> str | None:
+    """Return a BLAKE2b digest of the file contents, or None if unreadable."""
+    try:
+        return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+    except OSError:
+        return None
+
+
+def _cache_entry(path: Path) -> dict:
+    """Cache record for a file that passed: stat key plus content digest."""
+    return {"stat": _stat_key(path), "hash": _file_digest(path)}
+
+
+def _is_unchanged(entry: dict | None, path: Path) -> bool:
+    """Check a cache record against path: stat key first, content digest as fallback.
+
+    A file whose mtime changed without its contents (checkout, stash, editor
+    save) still counts as unchanged; its record is refreshed in place.
+    """
+    if not isinstance(entry, dict):
+        return False
+    stat = _stat_key(path)
+    if entry.get("stat") == stat:
+        return True
+    if entry.get("hash") is not None and entry.get("hash") == _file_digest(path):
+        entry["stat"] = stat
+        return True
+    return False
+
+
+def _compiled_sources(compile_commands: Path) -> set[str] | None:
+    """Normalized paths of every file in a compilation database (duplicates collapse).
+
+    Returns None if the database cannot be read.
+    """
+    try:
+        with open(compile_commands, encoding="utf-8") as f:
+            entries = json.load(f)
+    except OSError, ValueError:
+        return None
+    return {
+        os.path.normcase(os.path.abspath(os.path.join(e["directory"], e["file"])))
+        for e in entries
+        if "directory" in e and "file" in e
+    }
+
+
+def _python_snapshot(scripts_dir: Path) -> dict[str, list[int] | None]:
+    """Map every Python file under scripts_dir to its stat key."""
+    snapshot = {}
+    for root, dirs, files in os.walk(scripts_dir):
+        dirs[:] = [d for d in dirs if d != "__pycache__"]
+        for name in files:
+            if name.endswith(".py"):
+                path = Path(root) / name
+                snapshot[str(path)] = _stat_key(path)
+    return snapshot
+
+
+def _run_clang_format(clang_format: str, files: list[Path], fix: bool) -> int:
+    """Run clang-format on a list of files and return its exit code."""
+    if fix:
+        cmd = [clang_format, "-i", "-style=file", *map(str, files)]
+    else:
+        cmd = [clang_format, "--style=file", "--dry-run", "--Werror", *map(str, files)]
+    # Only the exit code matters: no pipes to set up or drain per spawn
+    result = subprocess.run(
+        cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    return result.returncode
+
+
+def _make_batches(files: list[Path], batch_size: int) -> list[list[Path]]:
+    """Split files into batches of at most batch_size that fit the argv budget."""
+    batches = []
+    batch: list[Path] = []
+    length = 0
+    for file in files:
+        cost = len(str(file)) + 3  # separator plus possible quotes
+        if batch and (len(batch) >= batch_size or length + cost > CLANG_FORMAT_ARGV_BUDGET):
+            batches.append(batch)
+            batch, length = [], 0
+        batch.append(file)
+        length += cost
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _format_batch(clang_format: str, files: list[Path], fix: bool) -> list[tuple[Path, int]]:
+    """Format a batch of files, retrying per file on failure to find the culprits."""
+    returncode = _run_clang_format(clang_format, files, fix)
+    if returncode == 0 or len(files) == 1:
+        return [(file, returncode) for file in files]
+    return [(file, _run_clang_format(clang_format, [file], fix)) for file in files]
 
 
 def lint_frontend(fix: bool = False, unsafe: bool = False) -> bool:
@@ -34,13 +155,22 @@ def lint_frontend(fix: bool = False, unsafe: bool = False) -> bool:
         if unsafe:
             lint_cmd.append("--unsafe")
 
-    success, _ = utils.run_command(lint_cmd, "Biome lint", cwd=frontend_dir)
+    typecheck_cmd = [str(pkg_path), "run", "typecheck"]
 
-    # Run type check
-    print("\n[Type checking...]")
-    success2, _ = utils.run_command(
-        [str(pkg_path), "run", "typecheck"], "TypeScript check", cwd=frontend_dir
+    # Read-only Biome and tsc are independent; run both at once and print in
+    # order. With --fix Biome rewrites the sources tsc reads, so the two run
+    # one after the other and tsc checks the fixed files.
+    print(f"\n[Linting and type checking...] ({' '.join(lint_cmd)} | {' '.join(typecheck_cmd)})")
+    (lint_rc, lint_out), (typecheck_rc, typecheck_out) = utils.run_commands_parallel(
+        [(lint_cmd, frontend_dir), (typecheck_cmd, frontend_dir)],
+        max_workers=1 if fix else None,
     )
+    print("\n[Biome lint]")
+    print(lint_out, end="")
+    print("\n[Type checking...]")
+    print(typecheck_out, end="")
+    success = lint_rc == 0
+    success2 = typecheck_rc == 0
 
     if success and success2:
         print("\n[OK] Lint passed!")
@@ -50,7 +180,7 @@ def lint_frontend(fix: bool = False, unsafe: bool = False) -> bool:
         return False
 
 
-def lint_cpp(fix: bool = False) -> bool:
+def lint_cpp(fix: bool = False, jobs: int | None = None) -> bool:
     """Lint C++ code with clang-format."""
     project_root = utils.get_project_root()
     src_dir = project_root / "backend"
@@ -62,52 +192,57 @@ def lint_cpp(fix: bool = False) -> bool:
     print(f"{'#' * 60}")
 
     # Check for clang-format
-    clang_format = shutil.which("clang-format")
+    clang_format = utils.which("clang-format")
     if not clang_format:
         print("\nERROR: clang-format not found")
         print("Install: winget install LLVM.LLVM")
         return False
 
-    # Get version
-    try:
-        result = subprocess.run([clang_format, "--version"], capture_output=True, text=True)
-        print(f"\n{result.stdout.strip()}")
-    except Exception:
-        pass
+    # Get version (only re-queried when the clang-format binary changes)
+    cache_path = project_root / "build" / ".lint-cache.json"
+    cache = utils.read_json_cache(cache_path) or {}
+    tool = utils.tool_version(clang_format, cached=cache.get("tool"))
+    version = tool["version"] if tool else ""
+    if version:
+        print(f"\n{version}")
 
     # Find all C++ files
-    cpp_files = []
-    for ext in ["*.cpp", "*.h"]:
-        cpp_files.extend(src_dir.rglob(ext))
+    cpp_files = utils.find_source_files(src_dir, (".cpp", ".h"))
 
     if not cpp_files:
         print("\nERROR: No C++ files found")
         return False
 
-    print(f"\nFound {len(cpp_files)} C++ files")
+    # Skip files unchanged since they last passed (cache is reset when the
+    # clang-format version or .clang-format changes)
+    cache_key = [version, _stat_key(project_root / ".clang-format")]
+    passed = cache.get("files", {}) if cache.get("key") == cache_key else {}
+    stale_files = [f for f in cpp_files if not _is_unchanged(passed.get(str(f)), f)]
+
+    print(f"\nFound {len(cpp_files)} C++ files ({len(cpp_files) - len(stale_files)} unchanged)")
+
+    # Format files in batches across workers (output is reported in file order afterwards)
+    workers = jobs or utils.default_jobs()
+    batch_size = max(1, min(CLANG_FORMAT_BATCH_SIZE, -(-len(stale_files) // workers)))
+    batches = _make_batches(stale_files, batch_size)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        batch_results = executor.map(lambda batch: _format_batch(clang_format, batch, fix), batches)
+        results = [item for batch in batch_results for item in batch]
 
-    # Format files
     errors = 0
-    for file in cpp_files:
-        if fix:
-            # Auto-fix
-            result = subprocess.run(
-                [clang_format, "-i", "-style=file", str(file)], capture_output=True
-            )
-            if result.returncode != 0:
-                print(f"  [FAIL] {file.relative_to(project_root)}")
-                errors += 1
-            else:
-                print(f"  [OK] {file.relative_to(project_root)}")
+    for file, returncode in results:
+        if returncode != 0:
+            print(f"  [FAIL] {file.relative_to(project_root)}")
+            passed.pop(str(file), None)
+            errors += 1
         else:
-            # Check only
-            result = subprocess.run(
-                [clang_format, "--style=file", "--dry-run", "--Werror", str(file)],
-                capture_output=True,
-            )
-            if result.returncode != 0:
-                print(f"  [FAIL] {file.relative_to(project_root)}")
-                errors += 1
+            if fix:
+                print(f"  [OK] {file.relative_to(project_root)}")
+            passed[str(file)] = _cache_entry(file)
+
+    # Drop records of deleted or renamed files so the cache does not grow forever
+    current = {str(f): passed[str(f)] for f in cpp_files if str(f) in passed}
+    utils.write_json_cache(cache_path, {"key": cache_key, "tool": tool, "files": current})
 
     if errors > 0:
         print(f"\n[FAIL] {errors} file(s) need formatting")
@@ -119,6 +254,127 @@ def lint_cpp(fix: bool = False) -> bool:
         return True
 
 
+def lint_tidy(jobs: int | None = None) -> bool:
+    """Run clang-tidy over backend sources using build/compile_commands.json.
+
+    The backend is configured (not built) first if needed.
+    """
+    project_root = utils.get_project_root()
+    src_dir = project_root / "backend"
+    build_dir = project_root / "build"
+
+    print(f"\n{'#' * 60}")
+    print("#  clang-tidy")
+    print(f"{'#' * 60}")
+
+    clang_tidy = utils.which("clang-tidy")
+    if not clang_tidy:
+        print("\nERROR: clang-tidy not found")
+        print("Install: winget install LLVM.LLVM")
+        return False
+
+    # Configure only (no build) when compile_commands.json is missing or its
+    # CMake inputs changed; a fresh configuration is reused as-is
+    print("\n[Checking compile_commands.json...]")
+    if not build.configure_backend():
+        return False
+    if not (build_dir / "compile_commands.json").exists():
+        print("\nERROR: build/compile_commands.json not found")
+        print("clang-tidy needs the Ninja generator (install Ninja and rebuild)")
+        return False
+
+    # Translation units only; headers are checked through the files including them,
+    # so they take part in the cache key instead
+    source_files = utils.find_source_files(src_dir, (".cpp", ".h"))
+    cpp_files = [f for f in source_files if f.suffix == ".cpp"]
+
+    # Only translation units CMake actually compiles; anything else would be
+    # analyzed with guessed flags. Each file is checked once even if the
+    # database lists it several times.
+    compiled = _compiled_sources(build_dir / "compile_commands.json")
+    if compiled is not None:
+        skipped = len(cpp_files)
+        cpp_files = [f for f in cpp_files if os.path.normcase(str(f)) in compiled]
+        skipped -= len(cpp_files)
+        if skipped:
+            print(f"\n  Skipping {skipped} file(s) not in compile_commands.json")
+
+    # Reuse results for unchanged translation units. Any header change, a new
+    # clang-tidy, .clang-tidy or compile_commands.json invalidates everything.
+    cache_path = build_dir / ".tidy-cache.json"
+    cache_key = [
+        _stat_key(Path(clang_tidy)),
+        _stat_key(project_root / ".clang-tidy"),
+        _stat_key(build_dir / "compile_commands.json"),
+        {str(f): _stat_key(f) for f in source_files if f.suffix == ".h"},
+    ]
+    cache = utils.read_json_cache(cache_path) or {}
+    cached = cache.get("files", {}) if cache.get("key") == cache_key else {}
+    stale_files = [f for f in cpp_files if not _is_unchanged(cached.get(str(f)), f)]
+    unchanged = len(cpp_files) - len(stale_files)
+    print(f"\nFound {len(cpp_files)} translation units ({unchanged} unchanged)")
+
+    # Each file is an independent clang-tidy process; report in file order afterwards.
+    # clang-tidy needs the MSVC INCLUDE paths to find system headers.
+    fresh = utils.run_commands_parallel(
+        [([clang_tidy, "-p", str(build_dir), "--quiet", str(f)], None) for f in stale_files],
+        env=utils.get_msvc_env(),
+        max_workers=jobs,
+    )
+    fresh_by_file = dict(zip(stale_files, fresh, strict=True))
+    for file, (returncode, output) in fresh_by_file.items():
+        # Only clean runs are cached so failures are always re-reported live
+        if returncode == 0:
+            cached[str(file)] = {**_cache_entry(file), "output": output}
+        else:
+            cached.pop(str(file), None)
+    results = [fresh_by_file.get(f) or (0, cached[str(f)]["output"]) for f in cpp_files]
+    current = {str(f): cached[str(f)] for f in cpp_files if str(f) in cached}
+    utils.write_json_cache(cache_path, {"key": cache_key, "files": current})
+
+    warnings = 0
+    failed = 0
+    for file, (returncode, output) in zip(cpp_files, results, strict=True):
+        file_warnings = len(_TIDY_WARNING_RE.findall(output))
+        warnings += file_warnings
+        if returncode != 0:
+            failed += 1
+        if returncode != 0 or file_warnings:
+            status = "FAIL" if returncode != 0 else "WARN"
+            print(f"  [{status}] {file.relative_to(project_root)}")
+            print(output.rstrip())
+
+    if failed:
+        print(f"\n[FAIL] clang-tidy failed on {failed} file(s) ({warnings} warning(s))")
+        return False
+    print(f"\n[OK] clang-tidy passed ({warnings} warning(s))")
+    return True
+
+
+def _start_ruff(cmd: list[str]) -> subprocess.Popen:
+    return subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+
+def _finish_ruff(proc: subprocess.Popen) -> tuple[int, str, str]:
+    stdout, stderr = proc.communicate()
+    return proc.returncode, stdout, stderr
+
+
+def _run_ruff(cmd: list[str]) -> tuple[int, str, str]:
+    return _finish_ruff(_start_ruff(cmd))
+
+
+def _report_ruff(title: str, outcome: tuple[int, str, str]) -> bool:
+    """Print one ruff step's output and return whether it passed."""
+    returncode, stdout, stderr = outcome
+    print(f"\n{title}")
+    if stdout:
+        print(stdout)
+    if stderr:
+        print(stderr)
+    return returncode == 0
+
+
 def lint_python(fix: bool = False) -> bool:
     """Lint Python code with Ruff."""
     project_root = utils.get_project_root()
@@ -131,56 +387,50 @@ def lint_python(fix: bool = False) -> bool:
     print(f"{'#' * 60}")
 
     # Check for ruff
-    ruff = shutil.which("ruff")
+    ruff = utils.which("ruff")
     if not ruff:
         print("\nERROR: ruff not found")
         print("Install: uv pip install ruff")
         return False
 
-    # Get version
-    try:
-        result = subprocess.run([ruff, "--version"], capture_output=True, text=True)
-        print(f"\n{result.stdout.strip()}")
-    except Exception:
-        pass
+    # Get version (only re-queried when the ruff binary changes)
+    cache_path = project_root / "build" / ".lint-cache-python.json"
+    cache = utils.read_json_cache(cache_path) or {}
+    tool = utils.tool_version(ruff, cached=cache.get("tool"))
+    version = tool["version"] if tool else ""
+    if version:
+        print(f"\n{version}")
+
+    # Skip ruff entirely when nothing changed since the last passing run
+    cache_key = [version, _stat_key(project_root / "pyproject.toml")]
+    if cache.get("key") == cache_key and cache.get("files") == _python_snapshot(scripts_dir):
+        print("\n[OK] Python lint passed! (unchanged since last run)")
+        return True
 
-    # Run ruff check (linting)
-    print("\n[Linting...]")
     check_cmd = [ruff, "check", str(scripts_dir)]
+    format_cmd = [ruff, "format", str(scripts_dir)]
     if fix:
         check_cmd.append("--fix")
+    else:
+        format_cmd.insert(2, "--check")
 
-    result_check = subprocess.run(check_cmd, capture_output=True, text=True)
-    success_check = result_check.returncode == 0
-
-    if result_check.stdout:
-        print(result_check.stdout)
-    if result_check.stderr:
-        print(result_check.stderr)
-
-    # Run ruff format (formatting)
-    print("\n[Formatting...]")
     if fix:
-        format_cmd = [ruff, "format", str(scripts_dir)]
-        result_format = subprocess.run(format_cmd, capture_output=True, text=True)
-        success_format = result_format.returncode == 0
-
-        if result_format.stdout:
-            print(result_format.stdout)
-        if result_format.stderr:
-            print(result_format.stderr)
+        # Both commands rewrite files, so they must not overlap
+        check_out = _run_ruff(check_cmd)
+        format_out = _run_ruff(format_cmd)
     else:
-        # Check formatting without modifying
-        format_cmd = [ruff, "format", "--check", str(scripts_dir)]
-        result_format = subprocess.run(format_cmd, capture_output=True, text=True)
-        success_format = result_format.returncode == 0
+        # Read-only checks: run both at once and collect the output in order
+        check_proc = _start_ruff(check_cmd)
+        format_proc = _start_ruff(format_cmd)
+        check_out = _finish_ruff(check_proc)
+        format_out = _finish_ruff(format_proc)
 
-        if result_format.stdout:
-            print(result_format.stdout)
-        if result_format.stderr:
-            print(result_format.stderr)
+    success_check = _report_ruff("[Linting...]", check_out)
+    success_format = _report_ruff("[Formatting...]", format_out)
 
     if success_check and success_format:
+        snapshot = _python_snapshot(scripts_dir)
+        utils.write_json_cache(cache_path, {"key": cache_key, "tool": tool, "files": snapshot})
         print("\n[OK] Python lint passed!")
         return True
     else:
@@ -190,16 +440,23 @@ def lint_python(fix: bool = False) -> bool:
         return False
 
 
-def lint_all(fix: bool = False, unsafe: bool = False) -> bool:
-    """Lint frontend and C++ code (product code only)."""
+def lint_all(
+    fix: bool = False, unsafe: bool = False, tidy: bool = False, jobs: int | None = None
+) -> bool:
+    """Lint frontend and C++ code (product code only).
+
+    tidy=True also runs clang-tidy (configuring the backend if needed).
+    jobs caps the clang-format / clang-tidy workers (default: utils.default_jobs()).
+    """
     print(f"\n{'=' * 60}")
     print("  Linting All (Frontend + C++)")
     print(f"{'=' * 60}")
 
     success1 = lint_frontend(fix=fix, unsafe=unsafe)
-    success2 = lint_cpp(fix=fix)
+    success2 = lint_cpp(fix=fix, jobs=jobs)
+    success3 = lint_tidy(jobs=jobs) if tidy else True
 
-    if success1 and success2:
+    if success1 and success2 and success3:
         print(f"\n{'=' * 60}")
         print("  ALL LINTS PASSED")
         print(f"{'=' * 60}")
@@ -40,7 +40,7 @@ def test_frontend(watch: bool = False) -> bool:
     return success
 
 
-def test_backend(build_type: str = "Release") -> bool:
+def test_backend(build_type: str = "Release", refresh_env: bool = False) -> bool:
     """Run backend tests."""
     if build_type not in ("Debug", "Release"):
         print(f"ERROR: Invalid build type '{build_type}'")
@@ -59,7 +59,7 @@ def test_backend(build_type: str = "Release") -> bool:
         return False
 
     # Setup MSVC environment
-    env = utils.get_msvc_env()
+    env = utils.get_msvc_env(refresh=refresh_env)
 
     # Run CTest
     test_cmd = ["ctest", "--test-dir", "build", "--output-on-failure", "--parallel"]
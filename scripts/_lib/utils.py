@@ -1,18 +1,112 @@
 """Common utility functions for Velocity-DB build system."""
 
+import contextlib
+import functools
+import hashlib
+import json
+import locale
 import os
+import re
 import shutil
 import subprocess
 import sys
+import threading
+import uuid
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from pathlib import Path
 
+# Directories never descended into when collecting source files
+SOURCE_SKIP_DIRS = frozenset({".git", "build", "node_modules", "third_party", "__pycache__"})
 
+# KEY=VALUE lines from `set` output (lines without a key, e.g. "=C:=C:\", are skipped)
+_ENV_LINE_RE = re.compile(r"^([^=\r\n]+)=([^\r\n]*)")
+
+
+# Per-thread output buffer used by submit_buffered()
+_output_local = threading.local()
+
+
+class _ThreadBufferedStdout:
+    """sys.stdout proxy that diverts writes from buffering threads."""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, text: str) -> int:
+        buffer = getattr(_output_local, "buffer", None)
+        if buffer is None:
+            return self._stream.write(text)
+        buffer.append(text)
+        return len(text)
+
+    def flush(self) -> None:
+        if getattr(_output_local, "buffer", None) is None:
+            self._stream.flush()
+
+    def __getattr__(self, name: str):
+        return getattr(self._stream, name)
+
+
+def _run_buffered(func: Callable[..., bool], kwargs: dict) -> tuple[bool, str]:
+    _output_local.buffer = []
+    try:
+        result = func(**kwargs)
+    finally:
+        output = "".join(_output_local.buffer)
+        _output_local.buffer = None
+    return result, output
+
+
+def submit_buffered(
+    executor: Executor, func: Callable[..., bool], **kwargs
+) -> Future[tuple[bool, str]]:
+    """Submit func to executor with its output (prints and commands) buffered.
+
+    The future resolves to (result, output) so the caller can print the whole
+    block at once instead of interleaving it with foreground output.
+    """
+    if not isinstance(sys.stdout, _ThreadBufferedStdout):
+        sys.stdout = _ThreadBufferedStdout(sys.stdout)
+    return executor.submit(_run_buffered, func, kwargs)
+
+
+@functools.cache
+def which(tool: str, path: str | None = None) -> str | None:
+    """shutil.which, memoized for the life of the process."""
+    return shutil.which(tool, path=path)
+
+
+@functools.lru_cache(maxsize=1)
 def get_project_root() -> Path:
-    """Get the project root directory (resolves symlinks)."""
+    """Get the project root directory (resolves symlinks, once per process)."""
     script_dir = Path(__file__).resolve().parent.parent
     return script_dir.parent
 
 
+def read_json_cache(path: Path) -> dict | None:
+    """Read a JSON cache file, returning None if missing or unreadable."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except OSError, ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def write_json_cache(path: Path, data: dict) -> None:
+    """Write a JSON cache file atomically (failures are ignored)."""
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
 def run_command(
     cmd: list[str],
     description: str,
@@ -20,7 +114,11 @@ def run_command(
     env: dict | None = None,
     capture_output: bool = False,
 ) -> tuple[bool, str]:
-    """Run a command and return success status and output."""
+    """Run a command and return success status and output.
+
+    With capture_output=True, stdout is discarded and the captured stderr is
+    returned (decoded once from raw bytes).
+    """
     print(f"\n{'=' * 60}")
     print(f"  {description}")
     print(f"  Command: {' '.join(cmd)}")
@@ -28,14 +126,23 @@ def run_command(
         print(f"  Working directory: {cwd}")
     print(f"{'=' * 60}\n")
 
-    merged_env = os.environ.copy()
-    if env:
-        merged_env.update(env)
+    # Without overrides the child simply inherits our environment
+    merged_env = {**os.environ, **env} if env else None
 
     try:
         if capture_output:
-            result = subprocess.run(cmd, cwd=cwd, env=merged_env, capture_output=True, text=True)
-            return result.returncode == 0, result.stderr
+            result = subprocess.run(
+                cmd, cwd=cwd, env=merged_env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+            )
+            stderr = result.stderr.decode(locale.getpreferredencoding(False), "replace")
+            return result.returncode == 0, stderr
+        elif getattr(_output_local, "buffer", None) is not None:
+            # Buffered thread: collect the child's output instead of streaming it
+            result = subprocess.run(
+                cmd, cwd=cwd, env=merged_env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+            )
+            print(result.stdout.decode(locale.getpreferredencoding(False), "replace"), end="")
+            return result.returncode == 0, ""
         else:
             result = subprocess.run(cmd, cwd=cwd, env=merged_env)
             return result.returncode == 0, ""
@@ -47,33 +154,106 @@ def run_command(
         return False, str(e)
 
 
+def default_jobs() -> int:
+    """Worker count for parallel steps: VELOCITY_JOBS if set, else usable CPUs.
+
+    os.process_cpu_count() respects CPU affinity and job objects, so a
+    restricted CI runner is not oversubscribed.
+    """
+    try:
+        jobs = int(os.environ.get("VELOCITY_JOBS", ""))
+    except ValueError:
+        jobs = 0
+    return jobs if jobs > 0 else os.process_cpu_count() or 1
+
+
+def run_commands_parallel(
+    cmds: list[tuple[list[str], Path | None]],
+    env: dict | None = None,
+    max_workers: int | None = None,
+) -> list[tuple[int, str]]:
+    """Run independent commands concurrently.
+
+    Each (cmd, cwd) pair runs as its own process; stdout and stderr are
+    collected together. Returns (returncode, output) per command in input
+    order, with returncode -1 if the command could not be started.
+    """
+    merged_env = {**os.environ, **env} if env else None
+    encoding = locale.getpreferredencoding(False)
+
+    def run(cmd: list[str], cwd: Path | None) -> tuple[int, str]:
+        try:
+            with subprocess.Popen(
+                cmd, cwd=cwd, env=merged_env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+            ) as proc:
+                output, _ = proc.communicate()
+        except OSError as e:
+            return -1, f"ERROR: Failed to execute {cmd[0]}: {e}\n"
+        return proc.returncode, output.decode(encoding, "replace")
+
+    if not cmds:
+        return []
+    workers = min(len(cmds), max_workers or default_jobs())
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda item: run(*item), cmds))
+
+
+@functools.lru_cache(maxsize=1)
 def find_package_manager() -> tuple[str, Path] | None:
-    """Find available package manager (Bun or npm)."""
+    """Find available package manager (Bun or npm).
+
+    The result is cached in build/.pkgmgr.json keyed by a hash of PATH, so the
+    probe only runs again when PATH changes or the cached binary disappears.
+    """
+    cache_path = get_project_root() / "build" / ".pkgmgr.json"
+    cache_key = hashlib.sha1(os.environ.get("PATH", "").encode()).hexdigest()
+    cached = read_json_cache(cache_path)
+    if cached and cached.get("key") == cache_key and Path(cached["path"]).exists():
+        return (cached["name"], Path(cached["path"]))
+
+    pkg_info = _probe_package_manager()
+    if pkg_info:
+        name, path = pkg_info
+        write_json_cache(cache_path, {"key": cache_key, "name": name, "path": str(path)})
+    return pkg_info
+
+
+def _probe_package_manager() -> tuple[str, Path] | None:
+    """Probe PATH for Bun or npm.
+
+    shutil.which already verifies the executable exists; a broken install is
+    reported by run_command when the first real command fails.
+    """
     # Try Bun first (preferred)
-    bun_path = shutil.which("bun")
+    bun_path = which("bun")
     if bun_path:
-        try:
-            result = subprocess.run([bun_path, "--version"], capture_output=True, text=True)
-            if result.returncode == 0:
-                return ("bun", Path(bun_path))
-        except Exception:
-            pass
+        return ("bun", Path(bun_path))
 
     # Try npm as fallback
-    npm_path = shutil.which("npm")
+    npm_path = which("npm")
     if npm_path:
-        try:
-            result = subprocess.run([npm_path, "--version"], capture_output=True, text=True)
-            if result.returncode == 0:
-                return ("npm", Path(npm_path))
-        except Exception:
-            pass
+        return ("npm", Path(npm_path))
 
     return None
 
 
+@functools.lru_cache(maxsize=1)
 def find_vcvars() -> Path | None:
-    """Find vcvars64.bat for MSVC environment setup."""
+    """Find vcvars64.bat for MSVC environment setup.
+
+    VELOCITY_VCVARS may point at vcvars64.bat directly (e.g. on CI) to skip
+    probing the known install locations. Otherwise the path recorded in the
+    environment cache is reused while it still exists.
+    """
+    env_hint = os.environ.get("VELOCITY_VCVARS")
+    if env_hint and Path(env_hint).is_file():
+        return Path(env_hint)
+
+    cached = read_json_cache(get_project_root() / "build" / ".vcvars_cache.json") or {}
+    cached_path = (cached.get("key") or [None])[0]
+    if isinstance(cached_path, str) and Path(cached_path).is_file():
+        return Path(cached_path)
+
     possible_paths = [
         # VS 2022 (version 17)
         Path(
@@ -108,8 +288,39 @@ def find_vcvars() -> Path | None:
     return None
 
 
-def get_msvc_env() -> dict[str, str]:
-    """Get environment variables from vcvars64.bat."""
+def _vcvars_cache_key(vcvars: Path) -> list:
+    """Cache key for the vcvars environment.
+
+    vcvars64.bat itself rarely changes; Visual Studio updates add a new
+    VC/Tools/MSVC/<version> directory instead, which bumps that directory's mtime.
+    """
+    msvc_mtime = None
+    # A VELOCITY_VCVARS override may point at a shallow path with no VC tree
+    if len(vcvars.parents) > 2:
+        with contextlib.suppress(OSError):
+            msvc_mtime = (vcvars.parents[2] / "Tools" / "MSVC").stat().st_mtime_ns
+    # "full" marks the cache format; an interim format stored only the delta
+    return [str(vcvars), vcvars.stat().st_mtime_ns, msvc_mtime, "full"]
+
+
+def _env_delta(env: dict[str, str]) -> dict[str, str]:
+    """Return the entries of env that differ from os.environ."""
+    return {key: value for key, value in env.items() if os.environ.get(key) != value}
+
+
+@functools.cache
+def get_msvc_env(refresh: bool = False) -> dict[str, str]:
+    """Get the environment variables vcvars64.bat adds or changes.
+
+    Only the delta against os.environ is returned (PATH, INCLUDE, LIB, ...);
+    run_command() layers it over the inherited environment. The full vcvars
+    environment is cached in build/.vcvars_cache.json keyed by the vcvars path
+    and mtime, so vcvars64.bat only runs again when it changes (or when
+    refresh=True); the delta is taken against the current shell on every load,
+    so a cache written from a Developer Command Prompt stays complete in a plain
+    shell. The result is memoized in-process for commands that build and test
+    in one run.
+    """
     vcvars = find_vcvars()
     if not vcvars:
         print("ERROR: Could not find vcvars64.bat")
@@ -118,61 +329,330 @@ def get_msvc_env() -> dict[str, str]:
 
     print(f"Using MSVC from: {vcvars}")
 
-    # Run vcvars64.bat and capture environment
-    # Security: Using shell=True here is intentional and safe because:
-    # 1. vcvars path comes from find_vcvars() which only returns hardcoded system paths
-    # 2. No user input is involved in command construction
-    cmd = f'"{vcvars}" && set'
-    result = subprocess.run(  # nosemgrep: python.lang.security.audit.subprocess-shell-true
-        cmd,
-        capture_output=True,
-        text=True,
-        shell=True,  # Safe: vcvars path from find_vcvars() - hardcoded paths only
-    )
+    cache_path = get_project_root() / "build" / ".vcvars_cache.json"
+    cache_key = _vcvars_cache_key(vcvars)
+    cached = read_json_cache(cache_path) or {}
+    if not refresh and cached.get("key") == cache_key:
+        print("  (cached environment)")
+        return _env_delta(cached["env"])
 
-    if result.returncode != 0:
+    # Run vcvars64.bat and capture environment.
+    # cmd.exe is invoked directly (no shell=True wrapper): /d skips AutoRun
+    # scripts and /s strips the outer quotes so the quoted vcvars path survives.
+    # vcvars path comes from find_vcvars(), which only returns hardcoded system paths.
+    comspec = os.environ.get("COMSPEC", "cmd.exe")
+    cmd = f'"{comspec}" /d /s /c ""{vcvars}" && set"'
+    encoding = locale.getpreferredencoding(False)
+    env = {}
+    # Parse `set` output line by line while vcvars is still running
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as proc:
+        for raw_line in proc.stdout:
+            match = _ENV_LINE_RE.match(raw_line.decode(encoding, "replace"))
+            if not match:
+                continue
+            key, value = match.groups()
+            # Windows names are case-insensitive; match os.environ's upper-case
+            # keys so e.g. "Path" replaces "PATH" instead of duplicating it
+            if os.name == "nt":
+                key = key.upper()
+            env[key] = value
+
+    if proc.returncode != 0:
         print("ERROR: Failed to run vcvars64.bat")
         sys.exit(1)
 
-    env = {}
-    for line in result.stdout.splitlines():
-        if "=" in line:
-            key, _, value = line.partition("=")
-            env[key] = value
-    return env
+    # Keep the tool versions stored by check_build_tools(); they have their own keys
+    write_json_cache(cache_path, {**cached, "key": cache_key, "env": env})
+    return _env_delta(env)
+
+
+def _find_tool(tool: str, env: dict) -> str | None:
+    """Resolve tool on the build environment's PATH without spawning it."""
+    return which(tool, env.get("PATH") or env.get("Path"))
+
 
+def tool_version(exe: str, env: dict | None = None, cached: dict | None = None) -> dict | None:
+    """Return a {"key", "version"} entry for exe, spawning it only when stale.
+
+    The key is the executable path and mtime, so an unchanged tool is never
+    run again once its version has been recorded. Callers keep the entry in
+    their own JSON cache and pass it back as cached. Returns None if the tool
+    cannot report a version.
+    """
+    key = [exe, os.stat(exe).st_mtime_ns]
+    if cached and cached.get("key") == key:
+        return cached
 
-def check_build_tools(env: dict) -> bool:
-    """Check if required build tools are available."""
-    # Check CMake
     try:
-        result = subprocess.run(["cmake", "--version"], capture_output=True, text=True, env=env)
-        if result.returncode == 0:
-            version = result.stdout.split("\n")[0]
-            print(f"CMake: {version}")
-        else:
-            print("ERROR: CMake not found")
-            return False
-    except FileNotFoundError:
+        result = subprocess.run(
+            [exe, "--version"],
+            capture_output=True,
+            text=True,
+            env={**os.environ, **env} if env else None,
+        )
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+    return {"key": key, "version": result.stdout.split("\n")[0].strip()}
+
+
+def check_build_tools(env: dict) -> tuple[bool, bool]:
+    """Check if required build tools are available.
+
+    Returns (ok, ninja_available). Availability is decided by a PATH lookup;
+    version strings are only for display and are cached alongside the MSVC
+    environment in build/.vcvars_cache.json, so a warm run spawns nothing.
+    """
+    cmake = _find_tool("cmake", env)
+    ninja = _find_tool("ninja", env)
+    if not cmake:
         print("ERROR: CMake not found")
-        return False
+        return False, False
 
-    # Check Ninja
-    try:
-        result = subprocess.run(["ninja", "--version"], capture_output=True, text=True, env=env)
-        if result.returncode == 0:
-            version = result.stdout.strip()
-            print(f"Ninja: {version}")
-        else:
-            print("WARNING: Ninja not found, will use slower generator")
-    except FileNotFoundError:
+    cache_path = get_project_root() / "build" / ".vcvars_cache.json"
+    cache = read_json_cache(cache_path) or {}
+    old_tools = cache.get("tools", {})
+    found = {name: exe for name, exe in (("cmake", cmake), ("ninja", ninja)) if exe}
+
+    with ThreadPoolExecutor(max_workers=len(found)) as executor:
+        futures = {
+            name: executor.submit(tool_version, exe, env, old_tools.get(name))
+            for name, exe in found.items()
+        }
+        tools = {name: entry for name, future in futures.items() if (entry := future.result())}
+
+    def describe(name: str) -> str:
+        return tools[name]["version"] if name in tools else found[name]
+
+    print(f"CMake: {describe('cmake')}")
+    if ninja:
+        print(f"Ninja: {describe('ninja')}")
+    else:
         print("WARNING: Ninja not found, will use slower generator")
 
-    return True
+    if tools != old_tools:
+        cache["tools"] = tools
+        write_json_cache(cache_path, cache)
+
+    return True, ninja is not None
+
+
+def find_source_files(root: Path, suffixes: tuple[str, ...]) -> list[Path]:
+    """Collect files ending with any of suffixes in one walk, pruning SOURCE_SKIP_DIRS."""
+    found = []
+    for dirpath, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if d not in SOURCE_SKIP_DIRS]
+        found.extend(Path(dirpath, name) for name in files if name.endswith(suffixes))
+    return sorted(found)
+
+
+def find_first(
+    root: Path,
+    name: str,
+    skip: frozenset[str] = frozenset({"CMakeFiles", "_deps", ".vs"}),
+    max_depth: int = 3,
+) -> Path | None:
+    """Breadth-first search for the first file called name, skipping skip dirs.
+
+    Directories more than max_depth levels below root are not entered.
+    """
+    queue = deque([(root, 0)])
+    while queue:
+        directory, depth = queue.popleft()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if depth < max_depth and entry.name not in skip:
+                            queue.append((entry.path, depth + 1))
+                    elif entry.name == name:
+                        return Path(entry.path)
+        except OSError:
+            continue
+    return None
+
+
+def iter_files(root: Path) -> Iterator[os.DirEntry]:
+    """Yield a DirEntry for every regular file below root (symlinks are not followed).
+
+    DirEntry caches the type (and on Windows the stat data) from the directory
+    listing, so callers get is_file()/stat() without extra system calls.
+    Unreadable directories are skipped.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry
+        except OSError:
+            continue
+
+
+def summarize_tree(root: Path) -> tuple[int, int]:
+    """Return (file_count, total_size) for a directory tree in a single pass."""
+    file_count = 0
+    total_size = 0
+    for entry in iter_files(root):
+        file_count += 1
+        total_size += entry.stat(follow_symlinks=False).st_size
+    return file_count, total_size
+
+
+def link_or_copy(src: str, dst: str) -> str:
+    """copytree copy_function that hardlinks, falling back to a real copy.
+
+    Hardlinking fails across volumes or on filesystems without link support.
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        return shutil.copy2(src, dst)
+    return dst
+
+
+def copytree_parallel(src: Path, dst: Path, max_workers: int | None = None) -> tuple[int, int]:
+    """Copy a directory tree, placing files on a thread pool.
+
+    Directories are created up front in one scandir walk, then every file goes
+    through link_or_copy concurrently so slow real copies (across volumes)
+    overlap. The first failure is re-raised after the pool drains.
+
+    Returns (file_count, total_size) of the copied files, taken from the same
+    walk, so callers need not walk the copy again.
+    """
+    pairs = []
+    total_size = 0
+    stack = [(os.fspath(src), os.fspath(dst))]
+    while stack:
+        src_dir, dst_dir = stack.pop()
+        os.makedirs(dst_dir, exist_ok=True)
+        with os.scandir(src_dir) as it:
+            for entry in it:
+                target = os.path.join(dst_dir, entry.name)
+                if entry.is_dir():
+                    stack.append((entry.path, target))
+                else:
+                    pairs.append((entry.path, target))
+                    total_size += entry.stat().st_size
+
+    workers = min(len(pairs), max_workers or default_jobs()) or 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for _ in executor.map(lambda pair: link_or_copy(*pair), pairs):
+            pass
+    return len(pairs), total_size
+
+
+# Prefix of the sibling directories async_rmtree renames trees to
+TRASH_PREFIX = ".trash-"
+
+# Trash directories some thread of this process is already deleting
+_claimed_trash: set[str] = set()
+_claimed_trash_lock = threading.Lock()
+
+
+def _claim_stale_trash(directory: Path) -> list[Path]:
+    """Claim trash directories in directory left behind by earlier runs.
+
+    Directories already being deleted by this process are skipped, so two
+    concurrent sweeps of the same parent never delete the same tree.
+    """
+    stale = []
+    try:
+        with os.scandir(directory) as it, _claimed_trash_lock:
+            for entry in it:
+                if (
+                    entry.name.startswith(TRASH_PREFIX)
+                    and entry.path not in _claimed_trash
+                    and entry.is_dir(follow_symlinks=False)
+                ):
+                    _claimed_trash.add(entry.path)
+                    stale.append(Path(entry.path))
+    except OSError:
+        pass
+    return stale
+
+
+def _delete_trash(trash: Path) -> bool:
+    """Delete a claimed trash directory, warning about anything left behind.
+
+    A failed deletion (e.g. a file locked by WebView2, an editor or antivirus)
+    keeps its .trash-* name, so the next async_rmtree in the same directory or
+    `pdg clean` retries it.
+    """
+    failures: list[tuple[str, BaseException]] = []
+
+    def onexc(func, path, exc):
+        if not isinstance(exc, FileNotFoundError):
+            failures.append((path, exc))
+
+    try:
+        shutil.rmtree(trash, onexc=onexc)
+    finally:
+        with _claimed_trash_lock:
+            _claimed_trash.discard(str(trash))
+    if failures:
+        path, exc = failures[0]
+        print(
+            f"WARNING: Could not fully delete {trash} ({len(failures)} error(s),"
+            f" first: {path}: {exc}); it will be retried on the next clean",
+            file=sys.stderr,
+        )
+    return not failures
+
+
+def purge_trash(directory: Path) -> int:
+    """Synchronously delete leftover .trash-* directories in directory.
+
+    Returns the number of leftovers that were fully removed.
+    """
+    return sum(_delete_trash(trash) for trash in _claim_stale_trash(directory))
+
+
+def async_rmtree(path: Path) -> None:
+    """Remove a directory tree without blocking the caller.
+
+    The directory is renamed to a sibling trash name (a single metadata
+    operation) and deleted on a non-daemon thread, so the interpreter still
+    waits for the deletion before exiting. The same thread also deletes any
+    .trash-* siblings earlier runs failed to remove. Failures are reported as
+    warnings on stderr. Falls back to a synchronous rmtree if the rename fails.
+    """
+    trash = path.with_name(f"{TRASH_PREFIX}{uuid.uuid4().hex}")
+    try:
+        path.rename(trash)
+    except OSError:
+        shutil.rmtree(path)
+        return
+    with _claimed_trash_lock:
+        _claimed_trash.add(str(trash))
+    targets = [trash, *_claim_stale_trash(path.parent)]
+
+    def worker():
+        for target in targets:
+            _delete_trash(target)
+
+    threading.Thread(target=worker).start()
+
+
+# Project roots whose WebView2 cache was already cleared in this process
+_webview2_cleared: set[Path] = set()
 
 
 def clear_webview2_cache(project_root: Path) -> None:
-    """Clear WebView2 cache to ensure fresh frontend load."""
+    """Clear WebView2 cache to ensure fresh frontend load.
+
+    Only the first call per project root does any work; the cache is not
+    recreated until the app runs, so later calls (e.g. from build_all) are no-ops.
+    """
+    if project_root in _webview2_cleared:
+        return
+    _webview2_cleared.add(project_root)
+
     print("\n[Post-Build] Clearing WebView2 cache...")
     webview2_caches = [
         project_root / "build" / "Debug" / "VelocityDB.exe.WebView2",
@@ -183,7 +663,7 @@ def clear_webview2_cache(project_root: Path) -> None:
     for cache_path in webview2_caches:
         if cache_path.exists():
             try:
-                shutil.rmtree(cache_path)
+                async_rmtree(cache_path)
                 print(f"  [OK] Cleared: {cache_path.relative_to(project_root)}")
                 cleared = True
             except Exception as e:
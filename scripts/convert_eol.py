@@ -18,36 +18,45 @@ Examples:
 """
 
 import os
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # File extensions to process
-DEFAULT_EXTENSIONS = {
-    ".cpp",
-    ".h",
-    ".hpp",
-    ".c",
-    ".ts",
-    ".tsx",
-    ".js",
-    ".jsx",
-    ".json",
-    ".css",
-    ".html",
-    ".md",
-    ".yml",
-    ".yaml",
-    ".cmake",
-    ".bat",
-    ".ps1",
-    ".py",
-}
+DEFAULT_EXTENSIONS = frozenset(
+    {
+        ".cpp",
+        ".h",
+        ".hpp",
+        ".c",
+        ".ts",
+        ".tsx",
+        ".js",
+        ".jsx",
+        ".json",
+        ".css",
+        ".html",
+        ".md",
+        ".yml",
+        ".yaml",
+        ".cmake",
+        ".bat",
+        ".ps1",
+        ".py",
+    }
+)
 
 # Directories to skip
-SKIP_DIRS = {"node_modules", ".git", "build", "dist", "build-tidy", "__pycache__"}
+SKIP_DIRS = frozenset({"node_modules", ".git", "build", "dist", "build-tidy", "__pycache__"})
 
 # Specific files to include
-SPECIFIC_FILES = {"CMakeLists.txt", ".gitignore", ".gitattributes", ".clang-format", ".clang-tidy"}
+SPECIFIC_FILES = frozenset(
+    {"CMakeLists.txt", ".gitignore", ".gitattributes", ".clang-format", ".clang-tidy"}
+)
+
+# Any line ending: CRLF, lone CR or lone LF
+_EOL_RE = re.compile(rb"\r\n|\r|\n")
 
 
 def should_skip(path: Path) -> bool:
@@ -55,38 +64,45 @@ def should_skip(path: Path) -> bool:
     return any(part in SKIP_DIRS for part in path.parts)
 
 
+def is_target_eol(data: bytes, target_eol: str) -> bool:
+    """Check whether data already uses only target_eol line endings."""
+    cr = data.count(b"\r")
+    if target_eol == "lf":
+        return cr == 0
+    crlf = data.count(b"\r\n")
+    return cr == crlf and data.count(b"\n") == crlf
+
+
 def convert_file_eol(file_path: Path, target_eol: str) -> bool:
     """
     Convert a file's line endings.
     Returns True if file was modified, False otherwise.
     """
-    if should_skip(file_path):
-        return False
-
     try:
         # Read file as bytes
         content_bytes = file_path.read_bytes()
 
+        # Fast path: already in the target format (the common case on re-runs)
+        if is_target_eol(content_bytes, target_eol):
+            return False
+
         # Skip BOM if present
         offset = 0
         if content_bytes.startswith(b"\xef\xbb\xbf"):
             offset = 3
 
-        content = content_bytes[offset:].decode("utf-8", errors="replace")
+        # CR and LF are single ASCII bytes in UTF-8, so convert without decoding
+        content = content_bytes[offset:]
 
         if not content:
             return False
 
-        if target_eol == "crlf":
-            # Convert LF to CRLF (avoid double conversion)
-            # First normalize to LF, then convert to CRLF
-            new_content = content.replace("\r\n", "\n").replace("\r", "\n").replace("\n", "\r\n")
-        else:
-            # Convert to LF
-            new_content = content.replace("\r\n", "\n").replace("\r", "\n")
+        # One pass over the content: every CRLF, lone CR or lone LF becomes
+        # the target line ending (no double conversion of existing CRLF)
+        new_content = _EOL_RE.sub(b"\r\n" if target_eol == "crlf" else b"\n", content)
 
         if content != new_content:
-            file_path.write_bytes(new_content.encode("utf-8"))
+            file_path.write_bytes(content_bytes[:offset] + new_content)
             return True
 
         return False
@@ -100,23 +116,35 @@ def get_source_files(path: Path, extension: str | None = None) -> list[Path]:
     """Get all source files in a directory."""
     files: list[Path] = []
 
-    if not path.exists():
+    # Paths below the root are filtered by pruning during the walk
+    if not path.exists() or should_skip(path):
         return files
 
     if path.is_file():
         return [path]
 
-    for item in path.rglob("*"):
-        if item.is_file() and not should_skip(item):
+    # Single walk; skipped directories are pruned instead of descended into
+    for root, dirs, names in os.walk(path):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        for name in names:
+            suffix = os.path.splitext(name)[1]
             if extension:
-                if item.suffix == extension:
-                    files.append(item)
-            elif item.suffix in DEFAULT_EXTENSIONS or item.name in SPECIFIC_FILES:
-                files.append(item)
+                if suffix == extension:
+                    files.append(Path(root, name))
+            elif suffix in DEFAULT_EXTENSIONS or name in SPECIFIC_FILES:
+                files.append(Path(root, name))
 
     return files
 
 
+def convert_files(files: list[Path], target_eol: str) -> list[bool]:
+    """Convert files concurrently; returns convert_file_eol's result per file, in order."""
+    # I/O-bound work: threads overlap reads and writes across files
+    workers = min(32, (os.process_cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda f: convert_file_eol(f, target_eol), files))
+
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: python convert_eol.py <crlf|lf> [target]")
@@ -141,57 +169,31 @@ def main():
     print(f"Target EOL: {eol_type.upper()}")
     print(f"{'=' * 60}\n")
 
-    converted_count = 0
-    processed_count = 0
+    # (path, label) pairs; converted files are reported by label in this order
+    targets: list[tuple[Path, str]] = []
 
     if target:
         target_path = Path(target)
         if target_path.is_file():
             print(f"Converting file: {target}")
-            processed_count = 1
-            if convert_file_eol(target_path, eol_type):
-                print(f"  {target}")
-                converted_count = 1
+            targets.extend((f, target) for f in get_source_files(target_path))
         elif target_path.is_dir():
             print(f"Converting files in: {target}")
-            files = get_source_files(target_path)
-            for f in files:
-                processed_count += 1
-                if convert_file_eol(f, eol_type):
-                    print(f"  {f}")
-                    converted_count += 1
+            targets.extend((f, str(f)) for f in get_source_files(target_path))
         else:
             print(f"ERROR: Target not found: {target}")
             sys.exit(1)
     else:
         print("Converting all source files in project...")
 
-        # C++ sources
-        src_dir = project_root / "backend"
-        if src_dir.exists():
-            for f in get_source_files(src_dir):
-                processed_count += 1
-                if convert_file_eol(f, eol_type):
-                    print(f"  {f}")
-                    converted_count += 1
-
-        # Frontend sources
-        frontend_src = project_root / "frontend" / "src"
-        if frontend_src.exists():
-            for f in get_source_files(frontend_src):
-                processed_count += 1
-                if convert_file_eol(f, eol_type):
-                    print(f"  {f}")
-                    converted_count += 1
-
-        # Scripts
-        scripts_dir = project_root / "scripts"
-        if scripts_dir.exists():
-            for f in get_source_files(scripts_dir):
-                processed_count += 1
-                if convert_file_eol(f, eol_type):
-                    print(f"  {f}")
-                    converted_count += 1
+        # C++ sources, frontend sources, scripts
+        for src_dir in (
+            project_root / "backend",
+            project_root / "frontend" / "src",
+            project_root / "scripts",
+        ):
+            if src_dir.exists():
+                targets.extend((f, str(f)) for f in get_source_files(src_dir))
 
         # Root files
         for filename in [
@@ -205,10 +207,15 @@ def main():
         ]:
             root_file = project_root / filename
             if root_file.exists():
-                processed_count += 1
-                if convert_file_eol(root_file, eol_type):
-                    print(f"  {filename}")
-                    converted_count += 1
+                targets.append((root_file, filename))
+
+    results = convert_files([path for path, _ in targets], eol_type)
+    for (_, label), converted in zip(targets, results, strict=True):
+        if converted:
+            print(f"  {label}")
+
+    processed_count = len(targets)
+    converted_count = sum(results)
 
     print(f"\n{'=' * 60}")
     print(f"Processed: {processed_count} file(s)")
@@ -6,14 +6,15 @@
 Velocity-DB CLI - Unified build system interface
 
 Usage:
+    uv run scripts/pdg.py [-j N] <command> ...         # -j caps parallel jobs
     uv run scripts/pdg.py build [backend|frontend|all] [--clean]
     uv run scripts/pdg.py debug [--clean]              # Backend Debug build
     uv run scripts/pdg.py test [backend|frontend] [--watch]
-    uv run scripts/pdg.py lint [--fix] [--unsafe]
+    uv run scripts/pdg.py lint [--fix] [--unsafe] [--tidy]
     uv run scripts/pdg.py dev
     uv run scripts/pdg.py package
     uv run scripts/pdg.py release [version] [--draft] [--skip-checks]
-    uv run scripts/pdg.py check [build-type]
+    uv run scripts/pdg.py check [build-type] [--fail-fast]
     uv run scripts/pdg.py clean [logs|cache|all]
 
 Examples:
@@ -27,7 +28,12 @@ Examples:
 """
 
 import argparse
+import os
+import re
+import shutil
+import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add _lib to path
@@ -35,19 +41,37 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from _lib import build, lint, test, utils
 
+# Release tags: 1.2.3 or v1.2.3 (no pre-release suffix)
+_SEMVER_RE = re.compile(r"^v?\d+\.\d+\.\d+$")
+
+# Conventional-commit type prefix shown in release notes, e.g. "feat: " or "fix "
+_COMMIT_TYPE_RE = re.compile(r"^(feat|fix|perf|refactor|docs)[:\s]*")
+
+# Already-compressed formats are stored as-is in the release zip; deflating
+# them again costs CPU time for (almost) no size gain
+_ZIP_STORED_SUFFIXES = frozenset(
+    {".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".woff", ".woff2", ".gz", ".br", ".zip"}
+)
+
 
 def cmd_build(args):
     """Handle build command."""
     target = args.target
     clean = args.clean
     build_type = args.type
+    refresh_env = args.refresh_msvc_env
+    fast = args.fast
 
     if target == "backend":
-        return build.build_backend(build_type=build_type, clean=clean)
+        return build.build_backend(
+            build_type=build_type, clean=clean, refresh_env=refresh_env, fast=fast, jobs=args.jobs
+        )
     elif target == "frontend":
         return build.build_frontend(clean=clean)
     elif target == "all":
-        return build.build_all(build_type=build_type, clean=clean)
+        return build.build_all(
+            build_type=build_type, clean=clean, refresh_env=refresh_env, fast=fast, jobs=args.jobs
+        )
     else:
         print(f"ERROR: Unknown build target: {target}")
         return False
@@ -55,7 +79,13 @@ def cmd_build(args):
 
 def cmd_debug(args):
     """Handle debug command - quick backend debug build."""
-    return build.build_backend(build_type="Debug", clean=args.clean)
+    return build.build_backend(
+        build_type="Debug",
+        clean=args.clean,
+        refresh_env=args.refresh_msvc_env,
+        fast=args.fast,
+        jobs=args.jobs,
+    )
 
 
 def cmd_test(args):
@@ -65,7 +95,7 @@ def cmd_test(args):
     build_type = args.type
 
     if target == "backend":
-        return test.test_backend(build_type=build_type)
+        return test.test_backend(build_type=build_type, refresh_env=args.refresh_msvc_env)
     elif target == "frontend":
         return test.test_frontend(watch=watch)
     else:
@@ -77,7 +107,8 @@ def cmd_lint(args):
     """Handle lint command."""
     fix = args.fix
     unsafe = args.unsafe
-    return lint.lint_all(fix=fix, unsafe=unsafe)
+    tidy = args.tidy
+    return lint.lint_all(fix=fix, unsafe=unsafe, tidy=tidy, jobs=args.jobs)
 
 
 def cmd_dev(args):
@@ -116,24 +147,24 @@ def cmd_package(args):
 
     # Build all first
     print("\n[1/2] Building all...")
-    if not build.build_all(build_type="Release", clean=False):
+    if not build.build_all(build_type="Release", clean=False, jobs=args.jobs):
         print("\nERROR: Build failed")
         return False
 
     # Create package
     print("\n[2/2] Creating package...")
 
-    import shutil
-
     # Clean dist directory
     if dist_dir.exists():
-        shutil.rmtree(dist_dir)
+        utils.async_rmtree(dist_dir)
     dist_dir.mkdir()
 
     # Copy executable
     exe_path = project_root / "build" / "Release" / "VelocityDB.exe"
     if exe_path.exists():
-        shutil.copy(exe_path, dist_dir / "VelocityDB.exe")
+        # A real copy (the linker rewrites the exe in place), but through copy2:
+        # it keeps the timestamps and lets the OS clone blocks where supported
+        shutil.copy2(exe_path, dist_dir / "VelocityDB.exe")
         print(f"  [OK] Copied: {exe_path.name}")
     else:
         print(f"  [FAIL] Executable not found: {exe_path}")
@@ -142,8 +173,8 @@ def cmd_package(args):
     # Copy frontend
     frontend_dist = project_root / "build" / "Release" / "frontend"
     if frontend_dist.exists():
-        shutil.copytree(frontend_dist, dist_dir / "frontend")
-        file_count = sum(1 for _ in (dist_dir / "frontend").rglob("*") if _.is_file())
+        # build/<type>/frontend is recreated on every build, never written in place
+        file_count, frontend_size = utils.copytree_parallel(frontend_dist, dist_dir / "frontend")
         print(f"  [OK] Copied: frontend ({file_count} files)")
     else:
         print(f"  [FAIL] Frontend not found: {frontend_dist}")
@@ -154,7 +185,8 @@ def cmd_package(args):
     print("  PACKAGE CREATED")
     print(f"{'=' * 60}")
     print(f"\n  Output: {dist_dir}")
-    total_size = sum(f.stat().st_size for f in dist_dir.rglob("*") if f.is_file())
+    # dist holds only the executable and the frontend walked above
+    total_size = (dist_dir / "VelocityDB.exe").stat().st_size + frontend_size
     print(f"  Total size: {total_size / 1024 / 1024:.2f} MB")
 
     return True
@@ -162,9 +194,8 @@ def cmd_package(args):
 
 def cmd_release(args):
     """Handle release command - create versioned release package."""
-    import re
-    import shutil
-    import subprocess
+    # zipfile is only needed here; deferring it keeps it (and bz2/lzma) off
+    # the startup path of every other command
     import zipfile
 
     project_root = utils.get_project_root()
@@ -172,17 +203,26 @@ def cmd_release(args):
 
     def get_latest_tag() -> str | None:
         """Get latest semver tag from git."""
+        # Only tags starting with a digit (optionally after "v") are listed;
+        # pre-releases such as v1.2.0-rc1 still match and are skipped below
         result = subprocess.run(
-            ["git", "tag", "--sort=-v:refname"],
+            [
+                "git",
+                "for-each-ref",
+                "--sort=-v:refname",
+                "--format=%(refname:short)",
+                "refs/tags/v[0-9]*",
+                "refs/tags/[0-9]*",
+            ],
             capture_output=True,
             text=True,
             cwd=project_root,
         )
         if result.returncode != 0:
             return None
-        tags = result.stdout.strip().split("\n")
+        tags = result.stdout.split()
         for tag in tags:
-            if re.match(r"^v?\d+\.\d+\.\d+$", tag):
+            if _SEMVER_RE.match(tag):
                 return tag.lstrip("v")
         return None
 
@@ -198,19 +238,23 @@ def cmd_release(args):
 
     def get_commits_since_tag(tag: str) -> list[dict]:
         """Get commits since the specified tag."""
-        result = subprocess.run(
-            ["git", "log", f"v{tag}..HEAD", "--pretty=format:%s|%h|%an"],
-            capture_output=True,
-            text=True,
+        # Parsed while git streams; %x1f (unit separator) cannot occur in a
+        # subject, unlike "|". Subjects are UTF-8 whatever the console code page.
+        commits = []
+        with subprocess.Popen(
+            ["git", "log", f"v{tag}..HEAD", "--pretty=format:%s%x1f%h"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            encoding="utf-8",
+            errors="replace",
             cwd=project_root,
-        )
-        if result.returncode != 0 or not result.stdout.strip():
+        ) as proc:
+            for line in proc.stdout:
+                message, sep, commit_hash = line.rstrip("\n").partition("\x1f")
+                if sep:
+                    commits.append({"message": message, "hash": commit_hash})
+        if proc.returncode != 0:
             return []
-        commits = []
-        for line in result.stdout.strip().split("\n"):
-            parts = line.split("|")
-            if len(parts) >= 2:
-                commits.append({"message": parts[0], "hash": parts[1]})
         return commits
 
     def categorize_commits(commits: list[dict]) -> dict[str, list[str]]:
@@ -225,18 +269,8 @@ def cmd_release(args):
         }
         for commit in commits:
             msg = commit["message"]
-            if msg.startswith("feat"):
-                categories["feat"].append(msg)
-            elif msg.startswith("fix"):
-                categories["fix"].append(msg)
-            elif msg.startswith("perf"):
-                categories["perf"].append(msg)
-            elif msg.startswith("refactor"):
-                categories["refactor"].append(msg)
-            elif msg.startswith("docs"):
-                categories["docs"].append(msg)
-            else:
-                categories["other"].append(msg)
+            match = _COMMIT_TYPE_RE.match(msg)
+            categories[match.group(1) if match else "other"].append(msg)
         return categories
 
     def generate_release_notes(version: str, prev_tag: str | None) -> str:
@@ -250,28 +284,28 @@ def cmd_release(args):
             if categories["feat"]:
                 lines.append("## ✨ New Features\n")
                 for msg in categories["feat"]:
-                    clean = re.sub(r"^feat[:\s]*", "", msg)
+                    clean = _COMMIT_TYPE_RE.sub("", msg, count=1)
                     lines.append(f"- {clean}")
                 lines.append("")
 
             if categories["fix"]:
                 lines.append("## 🐛 Bug Fixes\n")
                 for msg in categories["fix"]:
-                    clean = re.sub(r"^fix[:\s]*", "", msg)
+                    clean = _COMMIT_TYPE_RE.sub("", msg, count=1)
                     lines.append(f"- {clean}")
                 lines.append("")
 
             if categories["perf"]:
                 lines.append("## ⚡ Performance\n")
                 for msg in categories["perf"]:
-                    clean = re.sub(r"^perf[:\s]*", "", msg)
+                    clean = _COMMIT_TYPE_RE.sub("", msg, count=1)
                     lines.append(f"- {clean}")
                 lines.append("")
 
             if categories["refactor"]:
                 lines.append("## 🔧 Internal Changes\n")
                 for msg in categories["refactor"]:
-                    clean = re.sub(r"^refactor[:\s]*", "", msg)
+                    clean = _COMMIT_TYPE_RE.sub("", msg, count=1)
                     lines.append(f"- {clean}")
                 lines.append("")
 
@@ -297,7 +331,7 @@ def cmd_release(args):
     # Step 1: Run checks (unless skipped)
     if not args.skip_checks:
         print("\n[1/5] Running checks...")
-        if not lint.lint_all(fix=False):
+        if not lint.lint_all(fix=False, jobs=args.jobs):
             print("\nERROR: Lint failed. Use --skip-checks to bypass.")
             return False
         if not test.test_frontend(watch=False):
@@ -308,14 +342,14 @@ def cmd_release(args):
 
     # Step 2: Build Release
     print("\n[2/5] Building Release...")
-    if not build.build_all(build_type="Release", clean=True):
+    if not build.build_all(build_type="Release", clean=True, jobs=args.jobs):
         print("\nERROR: Build failed")
         return False
 
     # Step 3: Create dist directory
     print("\n[3/5] Creating distribution...")
     if dist_dir.exists():
-        shutil.rmtree(dist_dir)
+        utils.async_rmtree(dist_dir)
     dist_dir.mkdir()
 
     exe_path = project_root / "build" / "Release" / "VelocityDB.exe"
@@ -328,8 +362,9 @@ def cmd_release(args):
         print(f"  [FAIL] Frontend not found: {frontend_dist}")
         return False
 
-    shutil.copy(exe_path, dist_dir / "VelocityDB.exe")
-    shutil.copytree(frontend_dist, dist_dir / "frontend")
+    # Same staging as cmd_package: the exe is a real copy, the frontend hardlinked
+    shutil.copy2(exe_path, dist_dir / "VelocityDB.exe")
+    utils.copytree_parallel(frontend_dist, dist_dir / "frontend")
     print("  [OK] Files copied")
 
     # Step 4: Generate release notes
@@ -346,10 +381,10 @@ def cmd_release(args):
     zip_path = project_root / zip_name
 
     with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
-        for file in dist_dir.rglob("*"):
-            if file.is_file():
-                arcname = file.relative_to(dist_dir)
-                zf.write(file, arcname)
+        for entry in utils.iter_files(dist_dir):
+            suffix = os.path.splitext(entry.name)[1].lower()
+            compress_type = zipfile.ZIP_STORED if suffix in _ZIP_STORED_SUFFIXES else None
+            zf.write(entry.path, os.path.relpath(entry.path, dist_dir), compress_type)
 
     zip_size = zip_path.stat().st_size / 1024 / 1024
     print(f"  [OK] Created: {zip_name} ({zip_size:.2f} MB)")
@@ -396,20 +431,53 @@ def cmd_check(args):
 
     errors = 0
 
-    # Lint
-    print("\n[1/3] Linting...")
-    if not lint.lint_all(fix=False):
-        errors += 1
-
-    # Test frontend
-    print("\n[2/3] Testing frontend...")
-    if not test.test_frontend(watch=False):
-        errors += 1
-
-    # Build all
-    print("\n[3/3] Building all...")
-    if not build.build_all(build_type=build_type, clean=False):
-        errors += 1
+    # build_frontend installs dependencies when node_modules is missing or
+    # stale, which would rewrite it under the background lint and tests. Do
+    # that install here first so the build below leaves node_modules alone;
+    # if it fails, the build would only retry it concurrently, so skip it.
+    deps_ok = True
+    pkg_info = utils.find_package_manager()
+    if pkg_info:
+        print("\n[0/3] Checking frontend dependencies...")
+        deps_ok = build.install_frontend_deps(*pkg_info, utils.get_project_root() / "frontend")
+        if not deps_ok:
+            errors += 1
+
+    # Lint and frontend tests only read sources and node_modules, so they run
+    # in the background while the build runs in the foreground; their output
+    # is shown afterwards. With --fail-fast the build waits for them and is
+    # skipped if either fails.
+    print("\n[1/3] Linting... (background)")
+    print("[2/3] Testing frontend... (background)")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        lint_future = utils.submit_buffered(executor, lint.lint_all, fix=False, jobs=args.jobs)
+        test_future = utils.submit_buffered(executor, test.test_frontend, watch=False)
+
+        # Build all
+        if not deps_ok:
+            print("\n[3/3] Building all... skipped (dependency install failed)")
+        elif not args.fail_fast:
+            print("\n[3/3] Building all...")
+            if not build.build_all(build_type=build_type, clean=False, jobs=args.jobs):
+                errors += 1
+
+        for title, future in (
+            ("[1/3] Linting", lint_future),
+            ("[2/3] Testing frontend", test_future),
+        ):
+            ok, output = future.result()
+            print(f"\n{title} (output)")
+            print(output, end="")
+            if not ok:
+                errors += 1
+
+    if args.fail_fast:
+        if errors:
+            print("\n[3/3] Building all... skipped (--fail-fast)")
+        else:
+            print("\n[3/3] Building all...")
+            if not build.build_all(build_type=build_type, clean=False, jobs=args.jobs):
+                errors += 1
 
     # Summary
     print(f"\n{'=' * 60}")
@@ -424,8 +492,6 @@ def cmd_check(args):
 
 def cmd_clean(args):
     """Handle clean command - remove logs, cache, etc."""
-    import shutil
-
     project_root = utils.get_project_root()
     target = args.target
 
@@ -439,10 +505,15 @@ def cmd_clean(args):
         # Clean log directory
         log_dir = project_root / "log"
         if log_dir.exists():
-            for log_file in log_dir.glob("*.log"):
-                log_file.unlink()
-                cleaned_items.append(f"  [OK] Deleted: {log_file.name}")
-            if not cleaned_items:
+            removed = 0
+            with os.scandir(log_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".log") and entry.is_file():
+                        os.unlink(entry.path)
+                        removed += 1
+            if removed:
+                cleaned_items.append(f"  [OK] Deleted: {removed} log file(s) in log/")
+            else:
                 cleaned_items.append("  [INFO] No log files found")
         else:
             cleaned_items.append("  [INFO] Log directory does not exist")
@@ -451,7 +522,7 @@ def cmd_clean(args):
         # Clean WebView2 cache
         webview_cache = project_root / "build" / "Release" / "VelocityDB.exe.WebView2"
         if webview_cache.exists():
-            shutil.rmtree(webview_cache)
+            utils.async_rmtree(webview_cache)
             cleaned_items.append("  [OK] Deleted: WebView2 cache")
         else:
             cleaned_items.append("  [INFO] WebView2 cache does not exist")
@@ -459,11 +530,23 @@ def cmd_clean(args):
         # Clean frontend node_modules/.cache
         frontend_cache = project_root / "frontend" / "node_modules" / ".cache"
         if frontend_cache.exists():
-            shutil.rmtree(frontend_cache)
+            utils.async_rmtree(frontend_cache)
             cleaned_items.append("  [OK] Deleted: Frontend cache")
 
-    for item in cleaned_items:
-        print(item)
+        # Remove .trash-* directories an earlier background delete left behind
+        trash_parents = [
+            project_root,
+            project_root / "build",
+            project_root / "build" / "Debug",
+            project_root / "build" / "Release",
+            project_root / "frontend",
+            project_root / "frontend" / "node_modules",
+        ]
+        purged = sum(utils.purge_trash(parent) for parent in trash_parents)
+        if purged:
+            cleaned_items.append(f"  [OK] Deleted: {purged} leftover .trash-* dir(s)")
+
+    print("\n".join(cleaned_items))
 
     print(f"\n{'=' * 60}")
     print("  CLEAN COMPLETE")
@@ -472,6 +555,14 @@ def cmd_clean(args):
     return True
 
 
+def _positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1: {value}")
+    return number
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -481,10 +572,19 @@ def main():
         epilog=__doc__,
     )
 
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=_positive_int,
+        default=None,
+        help="Max parallel jobs for builds and C++ linting (default: $VELOCITY_JOBS or CPU count)",
+    )
+
     subparsers = parser.add_subparsers(dest="command", help="Command to run")
 
     # Build command
     build_parser = subparsers.add_parser("build", aliases=["b"], help="Build project")
+    build_parser.set_defaults(handler=cmd_build)
     build_parser.add_argument(
         "target",
         choices=["backend", "frontend", "all"],
@@ -502,15 +602,33 @@ def main():
         default="Release",
         help="Build type for backend (default: Release)",
     )
+    build_parser.add_argument(
+        "--refresh-msvc-env", action="store_true", help="Re-run vcvars64.bat (ignore cache)"
+    )
+    build_parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Skip CMake's regeneration check during the build (CMAKE_SUPPRESS_REGENERATION)",
+    )
 
     # Debug command (shortcut for build backend --type Debug)
     debug_parser = subparsers.add_parser("debug", help="Backend Debug build (shortcut)")
+    debug_parser.set_defaults(handler=cmd_debug)
     debug_parser.add_argument(
         "--clean", "-c", action="store_true", help="Clean build (remove old artifacts)"
     )
+    debug_parser.add_argument(
+        "--refresh-msvc-env", action="store_true", help="Re-run vcvars64.bat (ignore cache)"
+    )
+    debug_parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Skip CMake's regeneration check during the build (CMAKE_SUPPRESS_REGENERATION)",
+    )
 
     # Test command
     test_parser = subparsers.add_parser("test", aliases=["t"], help="Run tests")
+    test_parser.set_defaults(handler=cmd_test)
     test_parser.add_argument(
         "target",
         choices=["backend", "frontend"],
@@ -528,22 +646,34 @@ def main():
         default="Release",
         help="Build type for backend tests (default: Release)",
     )
+    test_parser.add_argument(
+        "--refresh-msvc-env", action="store_true", help="Re-run vcvars64.bat (ignore cache)"
+    )
 
     # Lint command
     lint_parser = subparsers.add_parser("lint", aliases=["l"], help="Lint code")
+    lint_parser.set_defaults(handler=cmd_lint)
     lint_parser.add_argument("--fix", "-f", action="store_true", help="Auto-fix issues")
     lint_parser.add_argument(
         "--unsafe", "-u", action="store_true", help="Apply unsafe fixes (requires --fix)"
     )
+    lint_parser.add_argument(
+        "--tidy", action="store_true", help="Also run clang-tidy (configures the backend if needed)"
+    )
 
     # Dev command
-    subparsers.add_parser("dev", aliases=["d"], help="Start development server")
+    dev_parser = subparsers.add_parser("dev", aliases=["d"], help="Start development server")
+    dev_parser.set_defaults(handler=cmd_dev)
 
     # Package command
-    subparsers.add_parser("package", aliases=["p"], help="Create distribution package")
+    package_parser = subparsers.add_parser(
+        "package", aliases=["p"], help="Create distribution package"
+    )
+    package_parser.set_defaults(handler=cmd_package)
 
     # Release command
     release_parser = subparsers.add_parser("release", aliases=["r"], help="Create versioned release")
+    release_parser.set_defaults(handler=cmd_release)
     release_parser.add_argument("version", nargs="?", help="Version (e.g., 1.2.1). Auto-detect from git tags if omitted")
     release_parser.add_argument("--bump", choices=["patch", "minor", "major"], default="patch", help="Version bump type (default: patch)")
     release_parser.add_argument("--draft", action="store_true", help="Mark as draft release")
@@ -551,6 +681,7 @@ def main():
 
     # Check command
     check_parser = subparsers.add_parser("check", aliases=["c"], help="Run all checks")
+    check_parser.set_defaults(handler=cmd_check)
     check_parser.add_argument(
         "type",
         choices=["Debug", "Release"],
@@ -558,9 +689,16 @@ def main():
         nargs="?",
         help="Build type (default: Release)",
     )
+    check_parser.add_argument(
+        "--fail-fast",
+        "-x",
+        action="store_true",
+        help="Build only after lint and frontend tests pass",
+    )
 
     # Clean command
     clean_parser = subparsers.add_parser("clean", help="Clean logs, cache, etc.")
+    clean_parser.set_defaults(handler=cmd_clean)
     clean_parser.add_argument(
         "target",
         choices=["logs", "cache", "all"],
@@ -575,33 +713,8 @@ def main():
         parser.print_help()
         sys.exit(1)
 
-    # Route to appropriate command handler
-    command_map = {
-        "build": cmd_build,
-        "b": cmd_build,
-        "debug": cmd_debug,
-        "test": cmd_test,
-        "t": cmd_test,
-        "lint": cmd_lint,
-        "l": cmd_lint,
-        "dev": cmd_dev,
-        "d": cmd_dev,
-        "package": cmd_package,
-        "p": cmd_package,
-        "release": cmd_release,
-        "r": cmd_release,
-        "check": cmd_check,
-        "c": cmd_check,
-        "clean": cmd_clean,
-    }
-
-    handler = command_map.get(args.command)
-    if not handler:
-        print(f"ERROR: Unknown command: {args.command}")
-        sys.exit(1)
-
     try:
-        success = handler(args)
+        success = args.handler(args)
         sys.exit(0 if success else 1)
     except KeyboardInterrupt:
         print("\n\nInterrupted by user")
@@ -15,11 +15,13 @@ Requirements:
 # dependencies = []
 # ///
 
+import asyncio
+import io
 import json
 import os
 import subprocess
 import sys
-from typing import Any
+from typing import Any, TextIO
 
 # Force UTF-8 output on Windows
 if sys.platform == "win32":
@@ -27,40 +29,169 @@ if sys.platform == "win32":
 
 REPO = "TakumiOkayasu/Velocity-DB"
 
+# Auto-merge and branch protection in one round-trip. Actions permissions are
+# not exposed over GraphQL and still need the REST endpoint.
+_REPO_STATE_QUERY = """
+query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+    autoMergeAllowed
+    branchProtectionRules(first: 20) {
+      nodes {
+        pattern
+        requiresStatusChecks
+        requiresStrictStatusChecks
+        requiredStatusCheckContexts
+        isAdminEnforced
+        requiresApprovingReviews
+        requiredApprovingReviewCount
+        dismissesStaleReviews
+        restrictsPushes
+        requiresLinearHistory
+        allowsForcePushes
+        allowsDeletions
+        requiresConversationResolution
+      }
+    }
+  }
+}
+"""
 
-def run_gh_command(args: list[str], input_data: str | None = None) -> dict[str, Any] | None:
-    """Run gh CLI command and return JSON response."""
-    try:
-        cmd = ["gh"] + args
-        result = subprocess.run(
-            cmd,
-            input=input_data,
-            text=True,
-            capture_output=True,
-            check=True,
-        )
-        if result.stdout.strip():
-            return json.loads(result.stdout)
-        return None
-    except subprocess.CalledProcessError as e:
+# The branch protection rule for main as GraphQL reports it once
+# setup_branch_protection has been applied (status check contexts aside).
+_EXPECTED_MAIN_RULE = {
+    "requiresStatusChecks": True,
+    "requiresStrictStatusChecks": True,
+    "isAdminEnforced": True,
+    "requiresApprovingReviews": True,
+    "requiredApprovingReviewCount": 1,
+    "dismissesStaleReviews": False,
+    "restrictsPushes": False,
+    "requiresLinearHistory": True,
+    "allowsForcePushes": False,
+    "allowsDeletions": False,
+    "requiresConversationResolution": False,
+}
+_STATUS_CHECK_CONTEXTS = ["Lint", "CI Success"]
+
+# Body for the branch protection PUT (and its PATCH fallback), serialized once.
+_BRANCH_PROTECTION_RULES = {
+    "required_status_checks": {
+        "strict": True,
+        "contexts": _STATUS_CHECK_CONTEXTS,
+    },
+    "enforce_admins": True,
+    "required_pull_request_reviews": {
+        "required_approving_review_count": 1,
+        "dismiss_stale_reviews": False,
+    },
+    "restrictions": None,
+    "required_linear_history": True,
+    "allow_force_pushes": False,
+    "allow_deletions": False,
+    "required_conversation_resolution": False,
+}
+_BRANCH_PROTECTION_JSON = json.dumps(_BRANCH_PROTECTION_RULES)
+
+
+# Successful `gh api <path>` reads, keyed by path. Any write to a path drops
+# its entry, so a cached read never hides a change made during this run.
+_read_cache: dict[str, dict[str, Any]] = {}
+
+
+async def run_gh_command(args: list[str], input_data: str | None = None) -> dict[str, Any] | None:
+    """Run gh CLI command and return JSON response.
+
+    Runs as a coroutine so independent calls can overlap. Plain GET reads are
+    memoized for the rest of the run.
+    """
+    path = args[1] if len(args) >= 2 and args[0] == "api" else None
+    is_read = path is not None and len(args) == 2
+    if is_read and path in _read_cache:
+        return _read_cache[path]
+    if path is not None and not is_read:
+        _read_cache.pop(path, None)
+
+    proc = await asyncio.create_subprocess_exec(
+        "gh",
+        *args,
+        stdin=asyncio.subprocess.PIPE if input_data is not None else None,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await proc.communicate(input_data.encode() if input_data is not None else None)
+    if proc.returncode != 0:
         print(f"  [FAIL] Command failed: {' '.join(args)}", file=sys.stderr)
-        print(f"  Error: {e.stderr}", file=sys.stderr)
+        print(f"  Error: {stderr.decode('utf-8', 'replace')}", file=sys.stderr)
+        return None
+    if not stdout.strip():
         return None
+    try:
+        result = json.loads(stdout)
     except json.JSONDecodeError:
         print("  [FAIL] Failed to parse JSON response", file=sys.stderr)
         return None
+    if is_read:
+        _read_cache[path] = result
+    return result
+
+
+async def fetch_repository_state() -> dict[str, Any] | None:
+    """Fetch auto-merge and branch protection state with a single GraphQL query."""
+    owner, name = REPO.split("/")
+    result = await run_gh_command(
+        [
+            "api",
+            "graphql",
+            "-f",
+            f"query={_REPO_STATE_QUERY}",
+            "-f",
+            f"owner={owner}",
+            "-f",
+            f"name={name}",
+        ]
+    )
+    if not result:
+        return None
+    return (result.get("data") or {}).get("repository")
+
+
+async def fetch_current_settings() -> tuple[dict[str, Any] | None, dict[str, Any] | None]:
+    """Fetch repository state and Actions permissions concurrently."""
+    repo_state, actions_perms = await asyncio.gather(
+        fetch_repository_state(),
+        run_gh_command(["api", f"repos/{REPO}/actions/permissions/workflow"]),
+    )
+    return repo_state, actions_perms
+
+
+def _main_protection_rule(repo_state: dict[str, Any] | None) -> dict[str, Any] | None:
+    """Return the branch protection rule for main, if any."""
+    rules = (repo_state or {}).get("branchProtectionRules", {}).get("nodes", [])
+    return next((rule for rule in rules if rule.get("pattern") == "main"), None)
+
+
+def _actions_permissions_ok(actions_perms: dict[str, Any] | None) -> bool:
+    """Check that workflows have write access and may approve PRs."""
+    return bool(
+        actions_perms
+        and actions_perms.get("default_workflow_permissions") == "write"
+        and actions_perms.get("can_approve_pull_request_reviews")
+    )
 
 
 def check_gh_cli() -> bool:
-    """Check if gh CLI is installed and authenticated."""
+    """Check if gh CLI is installed and authenticated.
+
+    A single `gh auth status` covers both: a missing binary surfaces as
+    FileNotFoundError, so no separate `gh --version` probe is needed.
+    """
     try:
-        subprocess.run(["gh", "--version"], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
+        result = subprocess.run(["gh", "auth", "status"], capture_output=True)
+    except FileNotFoundError:
         print("Error: gh CLI is not installed", file=sys.stderr)
         print("Install: winget install GitHub.cli", file=sys.stderr)
         return False
 
-    result = subprocess.run(["gh", "auth", "status"], capture_output=True)
     if result.returncode != 0:
         print("Error: Not authenticated with GitHub", file=sys.stderr)
         print("Run: gh auth login", file=sys.stderr)
@@ -69,24 +200,33 @@ def check_gh_cli() -> bool:
     return True
 
 
-def enable_auto_merge() -> bool:
+async def enable_auto_merge(out: TextIO, repo_state: dict[str, Any] | None) -> bool:
     """Enable auto-merge setting for the repository."""
-    print("[1/4] Enabling auto-merge...")
-    result = run_gh_command(["api", f"repos/{REPO}", "-X", "PATCH", "-f", "allow_auto_merge=true"])
+    print("[1/4] Enabling auto-merge...", file=out)
+    if repo_state and repo_state.get("autoMergeAllowed"):
+        print("  [OK] Auto-merge already enabled", file=out)
+        return True
+
+    result = await run_gh_command(
+        ["api", f"repos/{REPO}", "-X", "PATCH", "-f", "allow_auto_merge=true"]
+    )
     if result and result.get("allow_auto_merge"):
-        print("  [OK] Auto-merge enabled")
+        print("  [OK] Auto-merge enabled", file=out)
         return True
-    print("  [FAIL] Failed to enable auto-merge")
+    print("  [FAIL] Failed to enable auto-merge", file=out)
     return False
 
 
-def configure_actions_permissions() -> bool:
+async def configure_actions_permissions(out: TextIO, actions_perms: dict[str, Any] | None) -> bool:
     """Configure GitHub Actions permissions to allow PR approvals."""
-    print("\n[2/4] Configuring Actions permissions...")
+    print("\n[2/4] Configuring Actions permissions...", file=out)
+    if _actions_permissions_ok(actions_perms):
+        print("  [OK] Actions permissions already configured", file=out)
+        return True
 
     # Note: This API call may fail with type error for can_approve_pull_request_reviews
     # The setting might need to be configured manually in GitHub UI
-    result = run_gh_command(
+    result = await run_gh_command(
         [
             "api",
             f"repos/{REPO}/actions/permissions/workflow",
@@ -100,97 +240,111 @@ def configure_actions_permissions() -> bool:
     )
 
     if result is not None:
-        print("  [OK] Actions permissions configured")
+        print("  [OK] Actions permissions configured", file=out)
         return True
 
     # Even if the API call fails, check if the setting is already correct
-    current = run_gh_command(["api", f"repos/{REPO}/actions/permissions/workflow"])
+    current = await run_gh_command(["api", f"repos/{REPO}/actions/permissions/workflow"])
     if current and current.get("can_approve_pull_request_reviews"):
-        print("  [OK] Actions permissions already configured")
+        print("  [OK] Actions permissions already configured", file=out)
         return True
 
-    print("  [WARN] Failed to configure Actions permissions via API")
-    print("  -> Manual configuration required at:")
-    print(f"    https://github.com/{REPO}/settings/actions")
-    print("    -> Enable 'Allow GitHub Actions to create and approve pull requests'")
+    print("  [WARN] Failed to configure Actions permissions via API", file=out)
+    print("  -> Manual configuration required at:", file=out)
+    print(f"    https://github.com/{REPO}/settings/actions", file=out)
+    print("    -> Enable 'Allow GitHub Actions to create and approve pull requests'", file=out)
     return False
 
 
-def setup_branch_protection() -> bool:
+async def setup_branch_protection(out: TextIO, repo_state: dict[str, Any] | None) -> bool:
     """Setup branch protection rules for main branch."""
-    print("\n[3/4] Setting up branch protection for 'main'...")
-
-    protection_rules = {
-        "required_status_checks": {
-            "strict": True,
-            "contexts": ["Lint", "CI Success"],
-        },
-        "enforce_admins": True,
-        "required_pull_request_reviews": {
-            "required_approving_review_count": 1,
-            "dismiss_stale_reviews": False,
-        },
-        "restrictions": None,
-        "required_linear_history": True,
-        "allow_force_pushes": False,
-        "allow_deletions": False,
-        "required_conversation_resolution": False,
-    }
+    print("\n[3/4] Setting up branch protection for 'main'...", file=out)
+    rule = _main_protection_rule(repo_state)
+    if (
+        rule
+        and all(rule.get(field) == value for field, value in _EXPECTED_MAIN_RULE.items())
+        and set(rule.get("requiredStatusCheckContexts") or ()) == set(_STATUS_CHECK_CONTEXTS)
+    ):
+        print("  [OK] Branch protection already configured", file=out)
+        return True
 
-    input_data = json.dumps(protection_rules)
-    result = run_gh_command(
+    result = await run_gh_command(
         ["api", f"repos/{REPO}/branches/main/protection", "-X", "PUT", "--input", "-"],
-        input_data=input_data,
+        input_data=_BRANCH_PROTECTION_JSON,
     )
 
     if result:
-        print("  [OK] Branch protection configured")
+        print("  [OK] Branch protection configured", file=out)
         return True
 
-    print("  [WARN] Branch protection may already exist, trying PATCH...")
-    result = run_gh_command(
+    print("  [WARN] Branch protection may already exist, trying PATCH...", file=out)
+    result = await run_gh_command(
         ["api", f"repos/{REPO}/branches/main/protection", "-X", "PATCH", "--input", "-"],
-        input_data=input_data,
+        input_data=_BRANCH_PROTECTION_JSON,
     )
 
     if result:
-        print("  [OK] Branch protection updated")
+        print("  [OK] Branch protection updated", file=out)
         return True
 
-    print("  [FAIL] Failed to configure branch protection")
+    print("  [FAIL] Failed to configure branch protection", file=out)
     return False
 
 
-def verify_settings() -> None:
-    """Verify all settings are configured correctly."""
+async def verify_settings() -> None:
+    """Verify all settings are configured correctly.
+
+    The GraphQL state query and the Actions permissions read are independent,
+    so they run concurrently and the results are reported in a fixed order
+    afterwards.
+    """
     print("\n[4/4] Verifying settings...\n")
 
+    repo_state, actions_perms = await fetch_current_settings()
+
     # Verify auto-merge
-    repo_info = run_gh_command(["api", f"repos/{REPO}"])
-    if repo_info and repo_info.get("allow_auto_merge"):
+    if repo_state and repo_state.get("autoMergeAllowed"):
         print("  [OK] Auto-merge: Enabled")
     else:
         print("  [FAIL] Auto-merge: Disabled")
 
     # Verify Actions permissions
-    actions_perms = run_gh_command(["api", f"repos/{REPO}/actions/permissions/workflow"])
-    if (
-        actions_perms
-        and actions_perms.get("default_workflow_permissions") == "write"
-        and actions_perms.get("can_approve_pull_request_reviews")
-    ):
+    if _actions_permissions_ok(actions_perms):
         print("  [OK] Actions permissions: Read/Write + Can approve PRs")
     else:
         print("  [FAIL] Actions permissions: Not configured correctly")
 
     # Verify branch protection
-    protection = run_gh_command(["api", f"repos/{REPO}/branches/main/protection"])
-    if protection:
+    if _main_protection_rule(repo_state):
         print("  [OK] Branch protection: Configured")
     else:
         print("  [FAIL] Branch protection: Not configured")
 
 
+async def apply_settings() -> bool:
+    """Configure the repository, then verify the result.
+
+    The current state is read first so settings that already match are not
+    written again. The three settings live on independent endpoints, so the
+    remaining writes are applied concurrently. Each step reports into its own
+    buffer, flushed in step order afterwards, so the output reads the same as
+    a serial run.
+    """
+    repo_state, actions_perms = await fetch_current_settings()
+
+    buffers = [io.StringIO() for _ in range(3)]
+    results = await asyncio.gather(
+        enable_auto_merge(buffers[0], repo_state),
+        configure_actions_permissions(buffers[1], actions_perms),
+        setup_branch_protection(buffers[2], repo_state),
+    )
+    for out in buffers:
+        print(out.getvalue(), end="")
+
+    await verify_settings()
+    return all(results)
+
+
 def main() -> int:
     """Main entry point."""
     print("=" * 60)
@@ -202,12 +356,7 @@ def main() -> int:
     if not check_gh_cli():
         return 1
 
-    success = True
-    success &= enable_auto_merge()
-    success &= configure_actions_permissions()
-    success &= setup_branch_protection()
-
-    verify_settings()
+    success = asyncio.run(apply_settings())
 
     print()
     print("=" * 60)